@@ -0,0 +1,128 @@
+# encoding: utf-8
+"""
+corpus.py
+
+Generates a synthetic Dylan API reference in reST: N libraries of M modules of
+K bindings each, one document per module, with classes, generic functions and
+their methods, functions, macros, constants and variables, and dense
+cross-references within and between modules.
+
+Copyright (c) 2011-2025 Dylan Hackers. All rights reserved.
+"""
+
+import argparse
+import os
+
+
+CHECKOUT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+CONF_PY = """\
+import os
+import sys
+sys.path.insert(0, {extension_path!r})
+
+project = 'Synthetic Dylan API'
+extensions = ['dylan.domain']
+primary_domain = 'dylan'
+html_theme = 'alabaster'
+"""
+
+# The kinds of binding, in the order they are generated.
+KINDS = ('class', 'generic-function', 'function', 'macro', 'constant', 'variable')
+
+
+def library_name (l):
+    return 'library-{0}'.format(l)
+
+def module_name (m):
+    return 'module-{0}'.format(m)
+
+def binding_name (kind, b):
+    if kind == 'class':
+        return '<class-{0}>'.format(b)
+    elif kind == 'macro':
+        return 'with-macro-{0}'.format(b)
+    elif kind == 'constant':
+        return '$constant-{0}'.format(b)
+    elif kind == 'variable':
+        return '*variable-{0}*'.format(b)
+    return '{0}-{1}'.format(kind, b)
+
+def docname (l, m):
+    return '{0}/{1}'.format(library_name(l), module_name(m))
+
+
+def module_document (l, m, libraries, modules, bindings):
+    """Returns the reST text of the document for module m of library l."""
+    title = '{0} module'.format(module_name(m))
+    lines = [title, '=' * len(title), '']
+    if m == 0:
+        lines += ['.. library:: {0}'.format(library_name(l)), '']
+    else:
+        lines += ['.. current-library:: {0}'.format(library_name(l)), '']
+    lines += ['.. module:: {0}'.format(module_name(m)), '',
+              '   The {0} module, see also :lib:`{1}`.'.format(module_name(m), library_name(l)), '']
+
+    other = '{0}:{1}'.format(library_name((l + 1) % libraries), module_name((m + 1) % modules))
+    for b in range(bindings):
+        kind = KINDS[b % len(KINDS)]
+        name = binding_name(kind, b)
+        near = binding_name('class', (b // len(KINDS)) * len(KINDS))
+        xrefs = ('See :class:`{0}`, :gf:`generic-function-{1}`, :class:`{2}:<class-0>` '
+                 'and :drm:`<object>`.'.format(near, b // len(KINDS) * len(KINDS) + 1, other))
+        if kind == 'class':
+            lines += ['.. class:: {0}'.format(name), '   :open:', '',
+                      '   :superclasses: :class:`<object>`', '',
+                      '   :keyword size: An :class:`<integer>`.', '',
+                      '   :description:', '', '      ' + xrefs, '']
+        elif kind == 'generic-function':
+            lines += ['.. generic-function:: {0}'.format(name), '   :open:', '',
+                      '   :signature: {0} *object* => *value*'.format(name), '',
+                      '   :parameter object: An instance of :class:`{0}`.'.format(near),
+                      '   :value value: An instance of :class:`<object>`.', '',
+                      '   :description:', '', '      ' + xrefs, '']
+            for specializer in (near, '<object>'):
+                lines += ['.. method:: {0}'.format(name),
+                          '   :specializer: {0}'.format(specializer), '',
+                          '   Calls :meth:`{0}({1})` and :func:`function-{2}`.'.format(
+                              name, specializer, b // len(KINDS) * len(KINDS) + 2), '']
+        elif kind == 'macro':
+            lines += ['.. macro:: {0}'.format(name), '   :statement:', '',
+                      '   :macrocall: ``{0} () ... end``'.format(name), '',
+                      '   ' + xrefs, '']
+        else:
+            lines += ['.. {0}:: {1}'.format(kind, name), '', '   ' + xrefs, '']
+    return '\n'.join(lines) + '\n'
+
+
+def write_corpus (srcdir, libraries, modules, bindings):
+    """Writes the corpus and its conf.py into srcdir; returns the docnames."""
+    docnames = []
+    for l in range(libraries):
+        os.makedirs(os.path.join(srcdir, library_name(l)), exist_ok=True)
+        for m in range(modules):
+            name = docname(l, m)
+            with open(os.path.join(srcdir, name + '.rst'), 'w', encoding='utf-8') as stream:
+                stream.write(module_document(l, m, libraries, modules, bindings))
+            docnames.append(name)
+
+    with open(os.path.join(srcdir, 'index.rst'), 'w', encoding='utf-8') as stream:
+        stream.write('Synthetic Dylan API\n===================\n\n'
+                     '.. toctree::\n   :maxdepth: 1\n\n')
+        stream.writelines('   {0}\n'.format(name) for name in docnames)
+    with open(os.path.join(srcdir, 'conf.py'), 'w', encoding='utf-8') as stream:
+        stream.write(CONF_PY.format(extension_path=os.path.join(CHECKOUT, 'sphinxcontrib')))
+    return docnames
+
+
+def main ():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('srcdir')
+    parser.add_argument('--libraries', type=int, default=10)
+    parser.add_argument('--modules', type=int, default=5)
+    parser.add_argument('--bindings', type=int, default=60)
+    args = parser.parse_args()
+    write_corpus(args.srcdir, args.libraries, args.modules, args.bindings)
+
+if __name__ == '__main__':
+    main()
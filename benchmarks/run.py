@@ -0,0 +1,173 @@
+# encoding: utf-8
+"""
+run.py
+
+Times the Dylan domain against a synthetic corpus (see corpus.py) using the
+extension in this checkout: a full build, a no-op rebuild and a rebuild after
+one file changes, each in a fresh interpreter, then resolve_xref throughput and
+DylanObjectsIndex.generate. Results are written as JSON, to compare commits.
+
+Copyright (c) 2011-2025 Dylan Hackers. All rights reserved.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import docutils.nodes as RST_NODES
+import sphinx
+import sphinx.addnodes as SPHINX_NODES
+from sphinx.application import Sphinx
+
+import corpus
+
+
+def git_revision ():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=corpus.CHECKOUT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+BUILD_SCRIPT = '''
+import io, os, sys, time
+sys.path.insert(0, {path!r})
+from sphinx.application import Sphinx
+start = time.perf_counter()
+app = Sphinx({srcdir!r}, {srcdir!r}, {outdir!r}, {doctreedir!r}, {builder!r},
+             status=None, warning=io.StringIO(), parallel={jobs!r})
+app.build()
+print(time.perf_counter() - start)
+'''
+
+
+def make_app (srcdir, outdir, jobs, builder):
+    return Sphinx(srcdir, srcdir, outdir, os.path.join(outdir, '.doctrees'), builder,
+                  status=None, warning=io.StringIO(), parallel=jobs)
+
+def timed_build (srcdir, outdir, jobs, builder):
+    """
+    Builds srcdir in a fresh interpreter, as CI would, so that no module-level
+    cache of an earlier build survives; returns the seconds taken.
+    """
+    script = BUILD_SCRIPT.format(path=os.path.join(corpus.CHECKOUT, 'sphinxcontrib'),
+                                 srcdir=srcdir, outdir=outdir,
+                                 doctreedir=os.path.join(outdir, '.doctrees'),
+                                 builder=builder, jobs=jobs)
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True,
+                            text=True, check=True)
+    return float(result.stdout.split()[-1])
+
+
+def bench_resolve_xref (app, docnames, references):
+    """Resolves references to every object from its own module; returns
+    resolutions per second."""
+    env = app.env
+    domain = env.get_domain('dylan')
+    xrefs = []
+    for (fullid, entry) in domain.data['objects'].items():
+        (library, _, module) = entry.prefix.partition(':')
+        if not module:
+            continue
+        target = fullid.rpartition(':')[2]
+        node = SPHINX_NODES.pending_xref('', refdomain='dylan')
+        node.dylan_curlibrary = library
+        node.dylan_curmodule = module
+        xrefs.append((domain.role_for_objtype(entry.objtype), target, node,
+                      RST_NODES.literal(target, target)))
+    if not xrefs:
+        return None
+    fromdocname = docnames[0]
+    count = 0
+    start = time.perf_counter()
+    while count < references:
+        for (typ, target, node, contnode) in xrefs:
+            domain.resolve_xref(env, fromdocname, app.builder, typ, target, node, contnode)
+        count += len(xrefs)
+    return count / (time.perf_counter() - start)
+
+
+def bench_generate (app, repeat):
+    """Times DylanObjectsIndex.generate without its cache; returns the best
+    seconds of repeat runs."""
+    from dylan.domain.dylandomain import DylanObjectsIndex
+    domain = app.env.get_domain('dylan')
+    best = None
+    for _ in range(repeat):
+        domain.index_cache.clear()
+        start = time.perf_counter()
+        DylanObjectsIndex(domain).generate()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run (workdir, args):
+    srcdir = os.path.join(workdir, 'source')
+    outdir = os.path.join(workdir, 'build')
+    docnames = corpus.write_corpus(srcdir, args.libraries, args.modules, args.bindings)
+
+    results = {}
+    results['full_build'] = timed_build(srcdir, outdir, args.jobs, args.builder)
+    results['noop_rebuild'] = timed_build(srcdir, outdir, args.jobs, args.builder)
+
+    changed = os.path.join(srcdir, docnames[len(docnames) // 2] + '.rst')
+    with open(changed, 'a', encoding='utf-8') as stream:
+        stream.write('\nAn edit, to rebuild this document.\n')
+    results['incremental_rebuild'] = timed_build(srcdir, outdir, args.jobs, args.builder)
+
+    # Loads the environment of the last build, without building.
+    app = make_app(srcdir, outdir, args.jobs, args.builder)
+    results['resolve_xref_per_second'] = bench_resolve_xref(app, docnames, args.references)
+    results['generate_seconds'] = bench_generate(app, args.repeat)
+    results['objects'] = len(app.env.get_domain('dylan').data['objects'])
+    return results
+
+
+def main ():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--libraries', type=int, default=10)
+    parser.add_argument('--modules', type=int, default=5)
+    parser.add_argument('--bindings', type=int, default=60)
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument('--builder', default='html')
+    parser.add_argument('--references', type=int, default=100000,
+                        help='number of references to resolve')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='runs of DylanObjectsIndex.generate')
+    parser.add_argument('--workdir', help='directory for the corpus and build; '
+                        'a temporary directory by default')
+    parser.add_argument('--output', help='JSON results file; standard output by default')
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.join(corpus.CHECKOUT, 'sphinxcontrib'))
+    if args.workdir:
+        results = run(args.workdir, args)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            results = run(workdir, args)
+
+    report = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'sphinx': sphinx.__version__,
+        'parameters': dict((name, getattr(args, name)) for name in
+                           ('libraries', 'modules', 'bindings', 'jobs', 'builder')),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as stream:
+            json.dump(report, stream, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+# encoding: utf-8
+"""
+startup.py
+
+Times how long the extension in this checkout takes to start, each run in a
+fresh interpreter: importing the extension once Sphinx itself is imported, and
+creating a Sphinx application for an empty project with and without the
+extension. It also checks that importing the extension does not load modules
+it loads lazily, such as sphinx.ext.graphviz or the DRM index. Results are written
+as JSON; with --max-import-ms, the exit status is 1 if the import is slower or
+a lazily loaded module was loaded.
+
+Copyright (c) 2011-2025 Dylan Hackers. All rights reserved.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import sphinx
+
+import corpus
+from run import git_revision
+
+
+# Modules of the extension that importing it must not load.
+LAZY_MODULES = ('autodoc', 'drmindex', 'drmmirror', 'federation', 'inheritance')
+
+# Other modules that importing the extension must not load.
+LAZY_DEPENDENCIES = ('pkg_resources', 'sphinx.ext.graphviz')
+
+# Imported before the timed import, so that only the extension's own modules
+# are timed.
+SPHINX_MODULES = ('docutils.parsers.rst', 'sphinx.application', 'sphinx.directives',
+                  'sphinx.domains', 'sphinx.roles', 'sphinx.util.docfields')
+
+IMPORT_SCRIPT = '''
+import json, sys, time
+sys.path.insert(0, {path!r})
+import {sphinx_modules}
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds,
+                   'loaded': [name for name in {lazy!r} if name in sys.modules]}}))
+'''
+
+INIT_SCRIPT = '''
+import io, json, sys, time
+sys.path.insert(0, {path!r})
+from sphinx.application import Sphinx
+start = time.perf_counter()
+Sphinx({srcdir!r}, {srcdir!r}, {outdir!r}, {doctreedir!r}, 'html',
+       status=None, warning=io.StringIO(), freshenv=True)
+print(json.dumps({{'seconds': time.perf_counter() - start}}))
+'''
+
+CONF_PY = '''\
+project = 'Startup'
+extensions = {extensions!r}
+'''
+
+
+def extension_path (module):
+    """Returns the sys.path entry from which module, of this checkout, imports."""
+    if module.startswith('sphinxcontrib.'):
+        return corpus.CHECKOUT
+    return os.path.join(corpus.CHECKOUT, 'sphinxcontrib')
+
+def run_script (script):
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True,
+                            text=True, check=True)
+    return json.loads(result.stdout)
+
+def bench_import (module, repeat):
+    """Returns the median seconds to import module and the lazy modules it loaded."""
+    lazy = list(LAZY_DEPENDENCIES) + ['{0}.{1}'.format(module, name) for name in LAZY_MODULES]
+    script = IMPORT_SCRIPT.format(path=extension_path(module), module=module, lazy=lazy,
+                                  sphinx_modules=', '.join(SPHINX_MODULES))
+    runs = [run_script(script) for _ in range(repeat)]
+    loaded = sorted(set(name for run in runs for name in run['loaded']))
+    return (statistics.median(run['seconds'] for run in runs), loaded)
+
+def bench_init (workdir, module, extensions, repeat):
+    """Returns the median seconds to create a Sphinx application with extensions."""
+    srcdir = os.path.join(workdir, 'source-{0}'.format(len(extensions)))
+    os.makedirs(srcdir, exist_ok=True)
+    with open(os.path.join(srcdir, 'conf.py'), 'w', encoding='utf-8') as stream:
+        stream.write(CONF_PY.format(extensions=extensions))
+    with open(os.path.join(srcdir, 'index.rst'), 'w', encoding='utf-8') as stream:
+        stream.write('Startup\n=======\n')
+    outdir = os.path.join(workdir, 'build-{0}'.format(len(extensions)))
+    script = INIT_SCRIPT.format(path=extension_path(module), srcdir=srcdir, outdir=outdir,
+                                doctreedir=os.path.join(outdir, '.doctrees'))
+    return statistics.median(run_script(script)['seconds'] for _ in range(repeat))
+
+
+def run (workdir, args):
+    results = {}
+    (results['import_seconds'], results['lazy_modules_loaded']) = \
+        bench_import(args.module, args.repeat)
+    results['init_seconds'] = bench_init(workdir, args.module, [args.module], args.repeat)
+    results['init_without_extension_seconds'] = bench_init(workdir, args.module, [], args.repeat)
+    return results
+
+
+def main ():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--module', default='sphinxcontrib.dylan.domain',
+                        help='the extension, e.g. dylan.domain')
+    parser.add_argument('--repeat', type=int, default=9,
+                        help='interpreters started per measurement')
+    parser.add_argument('--max-import-ms', type=float,
+                        help='fail if the median import takes longer')
+    parser.add_argument('--output', help='JSON results file; standard output by default')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = run(workdir, args)
+
+    report = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'sphinx': sphinx.__version__,
+        'parameters': {'module': args.module, 'repeat': args.repeat},
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as stream:
+            json.dump(report, stream, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+    if args.max_import_ms is not None:
+        if results['lazy_modules_loaded']:
+            sys.exit('importing {0} loaded {1}'.format(
+                args.module, ', '.join(results['lazy_modules_loaded'])))
+        if results['import_seconds'] * 1000 > args.max_import_ms:
+            sys.exit('importing {0} took {1:.1f} ms, more than {2} ms'.format(
+                args.module, results['import_seconds'] * 1000, args.max_import_ms))
+
+if __name__ == '__main__':
+    main()
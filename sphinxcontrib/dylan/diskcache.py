@@ -0,0 +1,111 @@
+# encoding: utf-8
+"""
+diskcache.py
+
+Files written whole by the extension: the values it caches in the doctree
+directory across builds, and the files it adds to the output. Each is written
+to a temporary file beside it and renamed into place, so readers, parallel
+ones included, never see a partial file.
+
+Copyright (c) 2011-2025 Dylan Hackers. All rights reserved.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+from sphinx.util import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def write_file (path, write, public=False):
+    """
+    Writes path by calling write with a binary stream. mkstemp makes the file
+    readable only by its owner; a public file, e.g. one that is served, is
+    made readable by everyone.
+    """
+    (fd, temporary) = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as stream:
+            write(stream)
+        if public:
+            os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+def replace_file (path, data):
+    """
+    Writes data to path as a public file, unless the file already has it.
+    Returns whether it wrote.
+    """
+    try:
+        with open(path, 'rb') as stream:
+            if stream.read() == data:
+                return False
+    except OSError:
+        pass
+    write_file(path, lambda stream: stream.write(data), public=True)
+    return True
+
+
+class DiskCache (object):
+    """
+    Values kept in memory and as one pickle each in directory. A value is
+    cached under a name, the stem of its file, and a key stored with it that
+    must match for the value to be used; the version, stored likewise, is
+    bumped when the cached form changes.
+
+    The cache only saves work: a file that cannot be read is computed again,
+    and one that cannot be written is left out.
+    """
+
+    def __init__ (self, directory, version):
+        self.directory = directory
+        self.version = version
+        self.memo = {}
+
+    def load (self, name, key, compute):
+        """Returns the value cached as name with key, else compute() after caching it."""
+        if (name, key) in self.memo:
+            return self.memo[(name, key)]
+        path = os.path.join(self.directory, name + '.pickle')
+        try:
+            with open(path, 'rb') as stream:
+                (version, cached_key, value) = pickle.load(stream)
+            if (version, cached_key) != (self.version, key):
+                raise ValueError(path)
+        except (OSError, ValueError, EOFError, AttributeError, ImportError,
+                pickle.UnpicklingError):
+            value = compute()
+            entry = (self.version, key, value)
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                write_file(path, lambda stream: pickle.dump(entry, stream,
+                                                            pickle.HIGHEST_PROTOCOL))
+            except OSError as error:
+                logger.verbose('Cannot write cache file {0}: {1}'.format(path, error))
+        self.memo[(name, key)] = value
+        return value
+
+    def load_file (self, path, parse):
+        """Returns parse(path), cached until the file at path changes."""
+        status = os.stat(path)
+        name = hashlib.sha256(path.encode('utf-8')).hexdigest()
+        key = (path, status.st_size, status.st_mtime_ns)
+        return self.load(name, key, lambda: parse(path))
+
+
+# (doctree directory, name) -> DiskCache
+_caches = {}
+
+def get_cache (env, name, version):
+    """Returns the DiskCache in the name subdirectory of env's doctree directory."""
+    if (env.doctreedir, name) not in _caches:
+        directory = os.path.join(env.doctreedir, name)
+        _caches[(env.doctreedir, name)] = DiskCache(directory, version)
+    return _caches[(env.doctreedir, name)]
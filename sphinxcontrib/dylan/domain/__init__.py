@@ -8,10 +8,47 @@ Created by Dustin Voss on 2011-11-10.
 Copyright (c) 2011-2025 Dylan Hackers. All rights reserved.
 """
 
-from .dylandomain import DylanDomain
+from . import bindings, dependencies, highlighting, inventories, profiling, search
+from .dylandomain import DylanDomain, collect_apiindex_pages, process_method_tables
+
+#
+# Sphinx event handlers for features whose modules are imported only by the
+# projects that use them; their directives are DylanDomain.lazy_directives.
+#
+
+def process_inheritance_diagrams (app, doctree, docname):
+    if 'sphinx.ext.graphviz' in app.extensions:
+        from . import inheritance
+        inheritance.process_inheritance_diagrams(app, doctree, docname)
+
+def check_drm_mirror (app, env):
+    if app.config.dylan_drm_mirror:
+        from . import drmmirror
+        drmmirror.env_check_consistency(app, env)
+
 
 def setup (app):
     # https://www.sphinx-doc.org/en/master/extdev/appapi.html#sphinx.application.Sphinx.add_config_value
+    app.add_config_value('dylan_apiindex_split', None, 'html')
     app.add_config_value('dylan_drm_url', 'https://opendylan.org/books/drm/', 'html')
+    app.add_config_value('dylan_drm_index', None, 'env')
+    app.add_config_value('dylan_drm_index_extra', {}, 'env')
+    app.add_config_value('dylan_drm_mirror', None, 'env')
+    app.add_config_value('dylan_federation', {}, 'env')
     # https://www.sphinx-doc.org/en/master/extdev/appapi.html#sphinx.application.Sphinx.add_domain
     app.add_domain(DylanDomain)
+    app.connect('doctree-resolved', process_method_tables)
+    app.connect('doctree-resolved', process_inheritance_diagrams)
+    app.connect('env-check-consistency', check_drm_mirror)
+    app.connect('html-collect-pages', collect_apiindex_pages)
+    bindings.setup(app)
+    dependencies.setup(app)
+    highlighting.setup(app)
+    inventories.setup(app)
+    profiling.setup(app)
+    search.setup(app)
+    # https://www.sphinx-doc.org/en/master/extdev/index.html#extension-metadata
+    return {
+        'parallel_read_safe': True,
+        'parallel_write_safe': True,
+    }
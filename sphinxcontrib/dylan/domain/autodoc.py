@@ -0,0 +1,405 @@
+# encoding: utf-8
+"""
+autodoc.py
+
+Directives that document a Dylan library or module from its .lid and .dylan
+source files, by emitting the Dylan domain's own directives for each define
+form and its preceding // doc comment. Parse results are cached on disk keyed
+by a hash of the source text, so unchanged files are never parsed again.
+
+Copyright (c) 2011-2025 Dylan Hackers. All rights reserved.
+"""
+
+import collections
+import hashlib
+import os
+import re
+
+import docutils.nodes as RST_NODES
+import docutils.parsers.rst.directives as DIRECTIVES
+
+from docutils.statemachine import StringList
+from sphinx.util import logging
+from sphinx.util.docutils import SphinxDirective
+
+from ..diskcache import get_cache
+
+
+logger = logging.getLogger(__name__)
+
+
+#
+# Dylan source parsing
+#
+
+
+# Bump when the parser's results change, to invalidate cached results.
+PARSER_VERSION = 1
+
+DylanSource = collections.namedtuple('DylanSource', 'headers definitions')
+    # headers: {lowercase keyword: value}
+    # definitions: [DylanDefinition, ...] in source order
+
+DylanDefinition = collections.namedtuple(
+    'DylanDefinition', 'kind name adjectives parameters values supers type exports doc line')
+    # kind: class, generic, method, function, constant, variable, macro,
+    #       library or module
+    # parameters, values: the text between the parentheses, or None
+    # supers: [superclass, ...] of a class
+    # type: the type of a constant or variable, or None
+    # exports: [name, ...] exported or created by a library or module
+    # doc: [line, ...] of the // comment preceding the definition
+    # line: 1-based line number of the define form
+
+DEFINE_RE = re.compile(
+    r'^[ \t]*define\s+((?:[\w!?*$%&<>=/~^+-]+\s+)*?)'
+    r'(class|generic|method|function|constant|variable|macro|library|module)\s+'
+    r'([^\s(;,]+)', re.MULTILINE)
+HEADER_RE = re.compile(r'^([\w-]+):[ \t]*(.*)$')
+COMMENT_RE = re.compile(r'^[ \t]*//+ ?(.*)$')
+EXPORT_RE = re.compile(r'\b(?:export|create)\s+([^;]*);')
+END_RE = re.compile(r'^[ \t]*end\b', re.MULTILINE)
+
+
+def parse_headers (lines):
+    """
+    Returns ({lowercase keyword: value}, index of the first body line) for the
+    Dylan file header at the start of lines. Continuation lines start with
+    whitespace and are joined to the value with a space.
+    """
+    headers = {}
+    keyword = None
+    for (i, line) in enumerate(lines):
+        if not line.strip():
+            return (headers, i + 1)
+        match = HEADER_RE.match(line)
+        if match:
+            keyword = match.group(1).lower()
+            headers[keyword] = match.group(2).strip()
+        elif keyword is not None and line[:1].isspace():
+            headers[keyword] = (headers[keyword] + ' ' + line.strip()).strip()
+        else:
+            return (headers, i)
+    return (headers, len(lines))
+
+def balanced (text, start):
+    """
+    Returns (contents, end) of the parenthesized text at or after start, where
+    end is the index after the closing parenthesis, or (None, start).
+    """
+    i = start
+    while i < len(text) and text[i] in ' \t\r\n':
+        i += 1
+    if i >= len(text) or text[i] != '(':
+        return (None, start)
+    depth = 0
+    for j in range(i, len(text)):
+        if text[j] == '(':
+            depth += 1
+        elif text[j] == ')':
+            depth -= 1
+            if depth == 0:
+                return (text[i + 1:j], j + 1)
+    return (None, start)
+
+def split_top_level (text):
+    """Splits text on commas outside parentheses."""
+    parts = []
+    depth = 0
+    current = []
+    for char in text:
+        if char in '([{':
+            depth += 1
+        elif char in ')]}':
+            depth -= 1
+        if char == ',' and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    if ''.join(current).strip():
+        parts.append(''.join(current).strip())
+    return parts
+
+def squeeze (text):
+    """Collapses runs of whitespace."""
+    return ' '.join(text.split())
+
+def doc_comment (lines, index):
+    """Returns the // comment lines immediately above lines[index]."""
+    doc = []
+    i = index - 1
+    while i >= 0:
+        match = COMMENT_RE.match(lines[i])
+        if not match:
+            break
+        doc.append(match.group(1).rstrip())
+        i -= 1
+    doc.reverse()
+    # Drop separator lines such as ////////// or // -----.
+    return [line for line in doc if line.strip('/-=* ')]
+
+def parse_source (text):
+    """Returns the DylanSource for the text of a .dylan or .lid file."""
+    lines = text.splitlines()
+    (headers, body_start) = parse_headers(lines)
+    line_starts = [0]
+    for line in lines:
+        line_starts.append(line_starts[-1] + len(line) + 1)
+    body_offset = line_starts[min(body_start, len(lines))]
+
+    definitions = []
+    for match in DEFINE_RE.finditer(text, body_offset):
+        (adjectives, kind, name) = (match.group(1).split(), match.group(2), match.group(3))
+        index = text.count('\n', 0, match.start())
+        parameters = values = type = None
+        supers = []
+        exports = []
+        end = match.end()
+        if kind in ('generic', 'method', 'function'):
+            (parameters, end) = balanced(text, end)
+            rest = text[end:end + 200].lstrip(' \t')
+            if rest.startswith('=>'):
+                (values, _) = balanced(text, end + text[end:].index('=>') + 2)
+                if values is None:
+                    values = re.split(r'[;\n]', rest[2:], 1)[0]
+            parameters = squeeze(parameters) if parameters is not None else None
+            values = squeeze(values) if values is not None else None
+        elif kind == 'class':
+            (contents, end) = balanced(text, end)
+            supers = [squeeze(s) for s in split_top_level(contents or '')]
+        elif kind in ('constant', 'variable'):
+            declaration = re.split(r'[;=]', text[match.start(3):match.start(3) + 500], 1)[0]
+            if '::' in declaration:
+                type = squeeze(declaration.split('::', 1)[1])
+        elif kind in ('library', 'module'):
+            found = END_RE.search(text, end)
+            body = text[end:found.start() if found else len(text)]
+            body = '\n'.join(line.split('//', 1)[0] for line in body.splitlines())
+            for clause in EXPORT_RE.findall(body):
+                exports.extend(squeeze(n) for n in split_top_level(clause))
+        definitions.append(DylanDefinition(kind, name, adjectives, parameters, values,
+                                           supers, type, exports,
+                                           doc_comment(lines, index), index + 1))
+    return DylanSource(headers, definitions)
+
+
+def method_specializer (parameters):
+    """
+    Returns the specializer of a method: the types of its required parameters,
+    e.g. "<integer>, <object>" for "(x :: <integer>, y)".
+    """
+    types = []
+    for parameter in split_top_level(parameters or ''):
+        if parameter.startswith('#'):
+            break
+        if '::' in parameter:
+            types.append(squeeze(parameter.split('::', 1)[1]))
+        elif '==' in parameter:
+            types.append('singleton({0})'.format(squeeze(parameter.split('==', 1)[1])))
+        else:
+            types.append('<object>')
+    return ', '.join(types)
+
+def lid_files (lid_path, headers):
+    """Returns the paths of the source files of a .lid file."""
+    directory = os.path.dirname(lid_path)
+    paths = []
+    for name in headers.get('files', '').split():
+        if not os.path.splitext(name)[1]:
+            name += '.dylan'
+        paths.append(os.path.join(directory, name))
+    return paths
+
+
+def parse_file (cache, path):
+    """
+    Returns the DylanSource of the file at path, cached in cache by a hash of
+    its text.
+    """
+    with open(path, 'rb') as stream:
+        data = stream.read()
+    return cache.load(hashlib.sha256(data).hexdigest(), None,
+                      lambda: parse_source(data.decode('utf-8', errors='replace')))
+
+
+#
+# Directive generation
+#
+
+
+# Adjectives of define forms that are also options of the Dylan directives.
+CLASS_ADJECTIVES = ('open', 'primary', 'free', 'abstract', 'concrete', 'sealed')
+FUNCTION_ADJECTIVES = ('open', 'sealed')
+
+
+class DylanAutoDirective (SphinxDirective):
+    """Common behavior of the autodoc directives."""
+
+    has_content = False
+    required_arguments = 1
+    optional_arguments = 0
+    final_argument_whitespace = False
+
+    option_spec = {
+        'all': DIRECTIVES.flag,
+    }
+
+    def parse_lid (self, filename):
+        """
+        Returns (library name, {source path: DylanSource}) for a .lid file, or
+        None if it cannot be read.
+        """
+        (_, lid_path) = self.env.relfn2path(filename, self.env.docname)
+        cache = get_cache(self.env, 'dylan-autodoc', PARSER_VERSION)
+        self.env.note_dependency(lid_path)
+        try:
+            lid = parse_file(cache, lid_path)
+        except OSError as error:
+            logger.warning('Cannot read Dylan library {0}: {1}'.format(lid_path, error),
+                           location=self.get_location())
+            return None
+        sources = {}
+        for path in lid_files(lid_path, lid.headers):
+            self.env.note_dependency(path)
+            try:
+                sources[path] = parse_file(cache, path)
+            except OSError as error:
+                logger.warning('Cannot read Dylan source {0}: {1}'.format(path, error),
+                               location=self.get_location())
+        return (lid.headers.get('library'), sources)
+
+    def module_exports (self, sources, module):
+        """Returns the names exported by module's define module form, or None."""
+        for source in sources.values():
+            for definition in source.definitions:
+                if definition.kind == 'module' and definition.name.lower() == module.lower():
+                    return set(name.lower() for name in definition.exports)
+        return None
+
+    def module_lines (self, library, module, sources):
+        """Returns (line, source, offset) triples documenting module's bindings."""
+        exports = None if 'all' in self.options else self.module_exports(sources, module)
+        output = []
+        seen = set()
+        for (path, source) in sources.items():
+            if source.headers.get('module', '').lower() != module.lower():
+                continue
+            for definition in source.definitions:
+                if definition.kind in ('library', 'module'):
+                    continue
+                if exports is not None and definition.name.lower() not in exports:
+                    continue
+                lines = self.definition_lines(library, module, definition)
+                # The directive and its options identify the object.
+                key = tuple(lines[:lines.index('')])
+                if key in seen:
+                    continue
+                seen.add(key)
+                output.extend((line, path, definition.line - 1) for line in lines)
+        return output
+
+    def definition_lines (self, library, module, definition):
+        """Returns the reST lines of the directive documenting definition."""
+        kind = definition.kind
+        adjectives = definition.adjectives
+        options = [':library: ' + library, ':module: ' + module]
+        fields = []
+        if kind == 'class':
+            directive = 'class'
+            options += [':' + a + ':' for a in CLASS_ADJECTIVES if a in adjectives]
+            if definition.supers:
+                fields.append(':superclasses: ' + ', '.join(
+                    ':dylan:class:`{0}`'.format(s) for s in definition.supers))
+        elif kind in ('generic', 'method', 'function'):
+            directive = {'generic': 'generic-function'}.get(kind, kind)
+            if kind != 'function':
+                options += [':' + a + ':' for a in FUNCTION_ADJECTIVES if a in adjectives]
+            if kind == 'method':
+                options.append(':specializer: ' + method_specializer(definition.parameters))
+            signature = '{0} ({1})'.format(definition.name, definition.parameters or '')
+            if definition.values is not None:
+                signature += ' => ({0})'.format(definition.values)
+            fields.append(':signature: ``{0}``'.format(signature))
+        elif kind in ('constant', 'variable'):
+            directive = kind
+            if kind == 'variable' and 'thread' in adjectives:
+                options.append(':thread:')
+            if definition.type:
+                fields.append(':type: ``{0}``'.format(definition.type))
+        else:
+            directive = 'macro'
+        lines = ['.. dylan:{0}:: {1}'.format(directive, definition.name)]
+        lines += ['   ' + option for option in options]
+        lines.append('')
+        if definition.doc:
+            lines += [('   ' + line) if line else '' for line in definition.doc]
+            lines.append('')
+        for field in fields:
+            lines += ['   ' + field, '']
+        return lines
+
+    def parse_lines (self, output):
+        content = StringList()
+        for (line, source, offset) in output:
+            content.append(line, source, offset)
+        node = RST_NODES.Element()
+        self.state.nested_parse(content, 0, node)
+        return node.children
+
+
+class DylanAutoLibrary (DylanAutoDirective):
+    """
+    Documents a library and each of its modules from the library's .lid file.
+
+    .. dylan:autolibrary:: path/to/library.lid
+    """
+
+    def run (self):
+        parsed = self.parse_lid(self.arguments[0])
+        if parsed is None:
+            return []
+        (library, sources) = parsed
+        if not library:
+            logger.warning('No Library: header in {0}'.format(self.arguments[0]),
+                           location=self.get_location())
+            return []
+        output = [('.. dylan:library:: ' + library, self.arguments[0], 0), ('', '', 0)]
+        modules = []
+        for source in sources.values():
+            for definition in source.definitions:
+                if definition.kind == 'module' and definition.name not in modules:
+                    modules.append(definition.name)
+        for module in modules:
+            output += [('.. dylan:module:: ' + module, self.arguments[0], 0),
+                       ('   :library: ' + library, self.arguments[0], 0), ('', '', 0)]
+            output += self.module_lines(library, module, sources)
+        return self.parse_lines(output)
+
+
+class DylanAutoModule (DylanAutoDirective):
+    """
+    Documents the bindings of one module of the library of a .lid file.
+
+    .. dylan:automodule:: module-name
+       :lid: path/to/library.lid
+    """
+
+    option_spec = dict(DylanAutoDirective.option_spec.items())
+    option_spec.update(dict({'lid': DIRECTIVES.unchanged_required}.items()))
+
+    def run (self):
+        if 'lid' not in self.options:
+            logger.warning('dylan:automodule requires the :lid: option',
+                           location=self.get_location())
+            return []
+        parsed = self.parse_lid(self.options['lid'])
+        if parsed is None:
+            return []
+        (library, sources) = parsed
+        if not library:
+            logger.warning('No Library: header in {0}'.format(self.options['lid']),
+                           location=self.get_location())
+            return []
+        module = self.arguments[0].strip()
+        return self.parse_lines(self.module_lines(library, module, sources))
@@ -0,0 +1,164 @@
+# encoding: utf-8
+"""
+bindings.py
+
+The dylan:bindings directive, which documents the bindings described by a
+JSON Lines file, one object per line. Generated reference pages can use it
+instead of emitting reST for docutils to parse back into nodes: each record
+is run through the Dylan domain's own directive for its kind, with the
+directive's content made directly as nodes, so the description, targets and
+index entries are the same as for the equivalent reST. The file is read a
+line at a time.
+
+A record has these keys, of which only name and kind are required:
+
+    name            the binding, or library or module, name
+    kind            the Dylan directive: class, generic-function, method,
+                    function, primitive, constant, variable, type, macro,
+                    library or module
+    library         the :library: option
+    module          the :module: option
+    adjectives      a list of adjectives; those that are options of the
+                    directive, e.g. sealed, are given as such, and the others
+                    as its :adjectives: option
+    specializer     the :specializer: option of a method
+    summary         the :summary: doc field
+    parameters      a list of {"name": ..., "description": ...} objects, the
+                    :param: doc fields
+    values          a list of {"name": ..., "description": ...} objects, the
+                    :value: doc fields
+
+Text may contain inline reST markup, such as `<integer>`:class:. Blank lines
+separate paragraphs.
+
+Copyright (c) 2011-2025 Dylan Hackers. All rights reserved.
+"""
+
+import json
+import re
+
+import docutils.nodes as RST_NODES
+import docutils.parsers.rst.directives as DIRECTIVES
+
+from docutils.statemachine import StringList
+from sphinx.util import logging
+from sphinx.util.docutils import SphinxDirective
+
+
+logger = logging.getLogger(__name__)
+
+PARAGRAPH_BREAK_RE = re.compile(r'\n\s*\n')
+
+
+class DylanBindings (SphinxDirective):
+    """
+    Documents the bindings described by a JSON Lines file.
+
+    .. dylan:bindings:: path/to/library.jsonl
+    """
+
+    has_content = False
+    required_arguments = 1
+    optional_arguments = 0
+    final_argument_whitespace = False
+
+    def run (self):
+        (relpath, path) = self.env.relfn2path(self.arguments[0], self.env.docname)
+        self.env.note_dependency(relpath)
+        domain = self.env.get_domain('dylan')
+        result = []
+        try:
+            with open(path, encoding='utf-8') as stream:
+                for (lineno, line) in enumerate(stream, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                        if not isinstance(record, dict):
+                            raise ValueError('not a JSON object')
+                        result.extend(self.describe(domain, record, path, lineno))
+                    except ValueError as error:
+                        logger.warning('Cannot document Dylan binding: {0}'.format(error),
+                                       location='{0}:{1}'.format(path, lineno))
+        except OSError as error:
+            logger.warning('Cannot read Dylan bindings {0}: {1}'.format(path, error),
+                           location=self.get_location())
+        return result
+
+    def describe (self, domain, record, path, lineno):
+        """
+        Returns the nodes of the description of record, a dict on line lineno
+        of the file at path, to which the nodes and the warnings about them
+        are attributed.
+        """
+        kind = record.get('kind')
+        name = record.get('name')
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError('missing "name"')
+        directive_class = domain.directive(kind) if isinstance(kind, str) else None
+        if directive_class is None or kind not in domain.object_types:
+            raise ValueError('unknown kind {0!r} of {1}'.format(kind, name))
+        directive = directive_class('dylan:' + kind, [name],
+                                    self.record_options(directive_class, record),
+                                    StringList(), self.lineno, self.content_offset,
+                                    self.block_text, self.state, self.state_machine)
+        directive.content_nodes = self.record_fields(record)
+        directive.source_info = (path, lineno)
+        result = directive.run()
+        for node in result:
+            for element in node.findall(RST_NODES.Element):
+                (element.source, element.line) = (path, lineno)
+        return result
+
+    def record_options (self, directive_class, record):
+        """Returns the directive options of record, as option_spec converts them."""
+        option_spec = directive_class.option_spec
+        options = {}
+        for key in ('library', 'module', 'specializer'):
+            if record.get(key) and key in option_spec:
+                options[key] = str(record[key])
+        adjectives = record.get('adjectives') or []
+        if isinstance(adjectives, str):
+            adjectives = adjectives.split()
+        others = []
+        for adjective in adjectives:
+            if option_spec.get(adjective) is DIRECTIVES.flag:
+                options[adjective] = None
+            else:
+                others.append(adjective)
+        if others and 'adjectives' in option_spec:
+            options['adjectives'] = ' '.join(others)
+        return options
+
+    def record_fields (self, record):
+        """Returns the field list of record's doc fields, or no nodes."""
+        fields = []
+        if record.get('summary'):
+            fields.append(self.field('summary', record['summary']))
+        for (key, fieldname) in (('parameters', 'param'), ('values', 'value')):
+            for item in record.get(key) or ():
+                if not isinstance(item, dict) or not item.get('name'):
+                    raise ValueError('{0} of {1} must be objects with a "name"'
+                                     .format(key, record['name']))
+                fields.append(self.field(fieldname + ' ' + item['name'],
+                                         item.get('description') or ''))
+        if not fields:
+            return []
+        return [RST_NODES.field_list('', *fields)]
+
+    def field (self, name, text):
+        """Returns the field that reST ":name: text" would produce."""
+        (name_nodes, messages) = self.state.inline_text(name, self.lineno)
+        body = RST_NODES.field_body()
+        for paragraph in PARAGRAPH_BREAK_RE.split(str(text).strip()):
+            if paragraph:
+                (text_nodes, more_messages) = self.state.inline_text(paragraph, self.lineno)
+                body += RST_NODES.paragraph(paragraph, '', *text_nodes)
+                messages += more_messages
+        field = RST_NODES.field('', RST_NODES.field_name(name, '', *name_nodes), body)
+        body += messages
+        return field
+
+
+def setup (app):
+    app.add_directive_to_domain('dylan', 'bindings', DylanBindings)
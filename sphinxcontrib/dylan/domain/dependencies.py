@@ -0,0 +1,84 @@
+# encoding: utf-8
+"""
+dependencies.py
+
+Tracks which documents refer to which Dylan names, so that when the documents
+read in an incremental build add, remove or move objects, the documents whose
+references may now resolve differently are written again as well.
+
+A reference key is the lowercase last component of a target or fullid without
+any specializer, e.g. "[integer]" or "copy-sequence". A reference and any
+object it may resolve to share a key. A document with an inheritance diagram
+also has the key DIAGRAM_KEY, and is written again whenever any class's
+superclasses change, since that may change the ancestors or descendants drawn.
+
+Copyright (c) 2011-2025 Dylan Hackers. All rights reserved.
+"""
+
+import sphinx.addnodes as SPHINX_NODES
+
+from sphinx.util import logging
+
+from .dylandomain import dylan_inheritance_diagram, dylan_method_table, name_to_id
+
+
+logger = logging.getLogger(__name__)
+
+# Not the key of any name, which has no colon.
+DIAGRAM_KEY = ':inheritance'
+
+
+def reference_key (target):
+    return name_to_id(target).partition('(')[0].rpartition(':')[2].lower()
+
+
+def document_references (doctree):
+    """Returns the reference keys of the Dylan references in doctree."""
+    keys = set()
+    for node in doctree.findall(SPHINX_NODES.pending_xref):
+        if node.get('refdomain') == 'dylan' or node.get('reftype') == 'any':
+            keys.add(reference_key(node['reftarget']))
+    for node in doctree.findall(dylan_method_table):
+        keys.add(reference_key(node['target']))
+    for node in doctree.findall(dylan_inheritance_diagram):
+        keys.update(reference_key(target) for target in node['targets'])
+        keys.add(DIAGRAM_KEY)
+    return frozenset(keys)
+
+
+def referring_documents (references, keys):
+    """Returns the docnames whose references include any of keys."""
+    return set(docname for (docname, refkeys) in references.items()
+               if not refkeys.isdisjoint(keys))
+
+
+#
+# Sphinx event handlers
+#
+
+
+def doctree_read (app, doctree):
+    keys = document_references(doctree)
+    if keys:
+        app.env.get_domain('dylan').data['references'][app.env.docname] = keys
+
+def env_updated (app, env):
+    # Sphinx asks which documents are outdated (env-get-outdated) before
+    # reading, when it is not yet known which objects will change; documents
+    # returned here are written again, re-resolving their references, without
+    # being read again.
+    domain = env.get_domain('dylan')
+    keys = set(reference_key(fullid) for fullid in domain.changed_objects())
+    if domain.changed_superclasses():
+        keys.add(DIAGRAM_KEY)
+    if not keys:
+        return []
+    affected = referring_documents(domain.data['references'], keys)
+    affected = sorted(docname for docname in affected if docname in env.all_docs)
+    if affected:
+        logger.verbose('{0} documents refer to changed Dylan objects'.format(len(affected)))
+    return affected
+
+def setup (app):
+    app.connect('doctree-read', doctree_read)
+    app.connect('env-updated', env_updated)
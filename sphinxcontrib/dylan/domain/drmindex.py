@@ -1,8 +1,28 @@
 # encoding: utf-8
 """
 Copyright (c) 2011-2025 Dylan Hackers. All rights reserved.
+
+Dylan Reference Manual link keys and the partial URLs they map to. The built-in
+index below is the default; a text or prebuilt binary index file can replace it
+(see the dylan_drm_index configurable), and site-local entries can extend it.
+
+Prebuilt index files are made from a text index with::
+
+  python drmindex.py INDEX.txt INDEX.drmidx
 """
 
+import array
+import functools
+import mmap
+import os
+import struct
+import sys
+
+from sphinx.util import logging
+
+
+logger = logging.getLogger(__name__)
+
 index = {
   "odd?": "Arithmetic_Operations#odd_",
   "even?": "Arithmetic_Operations#even_",
@@ -291,5 +311,197 @@ index = {
   "uninstantiable": "Classes#IX-570",
 }
 
-def lookup(key):
-  return index.get(key.lower().replace("\n", "_").replace(" ", "_"), key)
+@functools.lru_cache(maxsize=4096)
+def normalize_key(key):
+  return key.lower().replace("\n", "_").replace(" ", "_")
+
+
+class BuiltinIndex(object):
+  """The index above."""
+
+  def get(self, key):
+    return index.get(key)
+
+  def keys(self):
+    return index.keys()
+
+
+class TextIndex(object):
+  """
+  An index file in which each line is a Dylan name, whitespace, and the partial
+  URL. Blank lines are ignored, and other lines without both are warned about.
+  Read on first use.
+  """
+
+  def __init__(self, path):
+    self.path = path
+    self._entries = None
+
+  @property
+  def entries(self):
+    if self._entries is None:
+      entries = {}
+      with open(self.path, encoding='utf-8') as stream:
+        for (lineno, line) in enumerate(stream, 1):
+          fields = line.split(None, 1)
+          if len(fields) == 2:
+            entries[normalize_key(fields[0])] = fields[1].strip()
+          elif fields:
+            logger.warning('DRM index line has no partial URL: {0}'.format(line.strip()),
+                           location='{0}:{1}'.format(self.path, lineno))
+      self._entries = entries
+    return self._entries
+
+  def get(self, key):
+    return self.entries.get(key)
+
+  def keys(self):
+    return self.entries.keys()
+
+
+# Prebuilt index files start with MAGIC, the format version and the number of
+# entries, followed by the key and value offset tables (count + 1 little-endian
+# unsigned 32-bit offsets each) and then the UTF-8 key and value blobs. Keys are
+# normalized and sorted by their UTF-8 encoding.
+MAGIC = b'DYLDRM'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<6sHI')
+OFFSET = struct.Struct('<I')
+
+def write_binary_index(path, entries):
+  """Writes a prebuilt index file of entries, a mapping of key to partial URL."""
+  items = sorted((normalize_key(key).encode('utf-8'), location.encode('utf-8'))
+                 for (key, location) in entries.items())
+  key_offsets = array.array('I', [0])
+  value_offsets = array.array('I', [0])
+  for (key, location) in items:
+    key_offsets.append(key_offsets[-1] + len(key))
+    value_offsets.append(value_offsets[-1] + len(location))
+  if sys.byteorder != 'little':
+    key_offsets.byteswap()
+    value_offsets.byteswap()
+  with open(path, 'wb') as stream:
+    stream.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(items)))
+    stream.write(key_offsets.tobytes())
+    stream.write(value_offsets.tobytes())
+    stream.writelines(key for (key, _) in items)
+    stream.writelines(location for (_, location) in items)
+
+
+class BinaryIndex(object):
+  """A prebuilt index file, memory-mapped on first use."""
+
+  def __init__(self, path):
+    self.path = path
+    self._map = None
+    self._found = {}
+
+  def _open(self):
+    with open(self.path, 'rb') as stream:
+      data = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+    (magic, version, count) = (None, None, 0)
+    if len(data) >= HEADER.size:
+      (magic, version, count) = HEADER.unpack_from(data)
+    tables = HEADER.size + 8 * (count + 1)
+    if magic != MAGIC or version != FORMAT_VERSION or len(data) < tables:
+      data.close()
+      raise ValueError('{0} is not a version {1} DRM index file'.format(self.path, FORMAT_VERSION))
+    (keys_size,) = OFFSET.unpack_from(data, HEADER.size + 4 * count)
+    (values_size,) = OFFSET.unpack_from(data, tables - 4)
+    if tables + keys_size + values_size > len(data):
+      data.close()
+      raise ValueError('{0} is a truncated DRM index file'.format(self.path))
+    if sys.byteorder == 'little':
+      offsets = memoryview(data)[HEADER.size:tables].cast('I')
+    else:
+      offsets = array.array('I', data[HEADER.size:tables])
+      offsets.byteswap()
+    self.count = count
+    self.key_offsets = offsets[:count + 1]
+    self.value_offsets = offsets[count + 1:]
+    self.keys_start = tables
+    self.values_start = tables + self.key_offsets[count]
+    self._map = data
+
+  def _key(self, i):
+    return self._map[self.keys_start + self.key_offsets[i]:
+                     self.keys_start + self.key_offsets[i + 1]]
+
+  def get(self, key):
+    if key in self._found:
+      return self._found[key]
+    if self._map is None:
+      self._open()
+    target = key.encode('utf-8')
+    (lo, hi) = (0, self.count)
+    while lo < hi:
+      mid = (lo + hi) // 2
+      if self._key(mid) < target:
+        lo = mid + 1
+      else:
+        hi = mid
+    location = None
+    if lo < self.count and self._key(lo) == target:
+      location = self._map[self.values_start + self.value_offsets[lo]:
+                           self.values_start + self.value_offsets[lo + 1]].decode('utf-8')
+    self._found[key] = location
+    return location
+
+  def keys(self):
+    if self._map is None:
+      self._open()
+    return [self._key(i).decode('utf-8') for i in range(self.count)]
+
+
+class SiteIndex(object):
+  """Site-local entries, which take precedence over another index."""
+
+  def __init__(self, entries, base):
+    self.entries = dict((normalize_key(key), location) for (key, location) in entries.items())
+    self.base = base
+
+  def get(self, key):
+    location = self.entries.get(key)
+    return self.base.get(key) if location is None else location
+
+  def keys(self):
+    return set(self.entries.keys()).union(self.base.keys())
+
+
+def open_index(path):
+  """Returns a BinaryIndex or TextIndex for the file at path, per its contents."""
+  with open(path, 'rb') as stream:
+    magic = stream.read(len(MAGIC))
+  return BinaryIndex(path) if magic == MAGIC else TextIndex(path)
+
+
+builtin_index = BuiltinIndex()
+
+# (path, mtime, extra items) -> index
+_indexes = {}
+
+def get_index(path=None, extra=None):
+  """
+  Returns the index for the dylan_drm_index and dylan_drm_index_extra
+  configurables: the file at path, else the built-in index, extended by the
+  entries in extra. Indexes are kept until their file changes.
+  """
+  mtime = os.stat(path).st_mtime_ns if path else None
+  cache_key = (path, mtime, tuple(sorted((extra or {}).items())))
+  if cache_key not in _indexes:
+    found = open_index(path) if path else builtin_index
+    if extra:
+      found = SiteIndex(extra, found)
+    _indexes[cache_key] = found
+  return _indexes[cache_key]
+
+
+def lookup(key, source=builtin_index):
+  location = source.get(normalize_key(key))
+  return key if location is None else location
+
+
+if __name__ == '__main__':
+  if len(sys.argv) != 3:
+    sys.exit('usage: {0} INDEX.txt INDEX.drmidx'.format(sys.argv[0]))
+  write_binary_index(sys.argv[2], TextIndex(sys.argv[1]).entries)
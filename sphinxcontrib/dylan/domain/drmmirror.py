@@ -0,0 +1,119 @@
+# encoding: utf-8
+"""
+drmmirror.py
+
+Checks the build's :dylan:drm: links against a local copy of the Dylan
+Reference Manual's HTML, given by the dylan_drm_mirror configurable, instead
+of fetching each link from opendylan.org. The links are collected as
+documents are read and checked together once reading is done: keys not in
+the DRM index, and pages or anchors missing from the mirror, are reported
+with the nearest keys or anchors. The anchors of each page are extracted
+once and cached in the doctree directory until the file changes.
+
+Copyright (c) 2011-2025 Dylan Hackers. All rights reserved.
+"""
+
+import difflib
+import os
+import re
+
+from sphinx.util import logging
+
+from ..diskcache import get_cache
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached form changes.
+CACHE_VERSION = 1
+
+ANCHOR_RE = re.compile(r'''\s(?:id|name)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>"']+))''',
+                       re.IGNORECASE)
+
+# The names a page of the mirror may have, given its partial URL.
+PAGE_FILENAMES = ('{0}', '{0}.html', '{0}.htm', os.path.join('{0}', 'index.html'))
+
+
+def extract_anchors (path):
+    """Returns the set of id and name attribute values in the HTML file at path."""
+    with open(path, encoding='utf-8', errors='replace') as stream:
+        text = stream.read()
+    return frozenset(next(value for value in match.groups() if value is not None)
+                     for match in ANCHOR_RE.finditer(text))
+
+
+def page_path (mirror, page):
+    """Returns the path of the mirror's file for page, or None if it has none."""
+    for filename in PAGE_FILENAMES:
+        path = os.path.join(mirror, filename.format(page))
+        if os.path.isfile(path):
+            return path
+    return None
+
+def suggestions (word, possibilities):
+    matches = difflib.get_close_matches(word, possibilities, n=3)
+    if not matches:
+        return ''
+    return '; did you mean {0}?'.format(', '.join(repr(match) for match in matches))
+
+
+def check_drm_links (env, mirror, links):
+    """
+    Checks links, {docname: {(key, partial URL or None, line), ...}}, against
+    the DRM index and the mirror directory, warning about each broken link.
+    Returns the number of broken links.
+    """
+    from . import drmindex
+    index = env.get_domain('dylan').drm_index
+    cache = get_cache(env, 'dylan-drm-mirror', CACHE_VERSION)
+    keys = None
+    pages = {}
+        # page -> frozenset of anchors, or None if the mirror lacks the page
+    broken = 0
+    for docname in sorted(links):
+        for (key, location, line) in sorted(links[docname], key=lambda link: (link[2] or 0, link[0])):
+            where = (docname, line)
+            if location is None:
+                if keys is None:
+                    keys = list(index.keys())
+                logger.warning('Unknown DRM link key {0!r}{1}'.format(
+                                   key, suggestions(drmindex.normalize_key(key), keys)),
+                               location=where)
+                broken += 1
+                continue
+            if '://' in location:
+                continue
+            (page, _, anchor) = location.partition('#')
+            if page not in pages:
+                path = page_path(mirror, page)
+                pages[page] = cache.load_file(path, extract_anchors) if path else None
+            anchors = pages[page]
+            if anchors is None:
+                logger.warning('DRM link {0!r} goes to {1}, which is not in the DRM mirror'
+                               .format(key, page), location=where)
+                broken += 1
+            elif anchor and anchor not in anchors:
+                logger.warning('DRM link {0!r} goes to {1}, which has no anchor {2!r}{3}'
+                               .format(key, page, anchor, suggestions(anchor, anchors)),
+                               location=where)
+                broken += 1
+    return broken
+
+
+#
+# Sphinx event handlers
+#
+
+
+def env_check_consistency (app, env):
+    mirror = app.config.dylan_drm_mirror
+    if not mirror:
+        return
+    mirror = os.path.join(app.confdir, mirror)
+    if not os.path.isdir(mirror):
+        logger.warning('DRM mirror {0} is not a directory'.format(mirror))
+        return
+    links = env.get_domain('dylan').data['drmlinks']
+    broken = check_drm_links(env, mirror, links)
+    logger.info('checked {0} DRM links against {1}: {2} broken'.format(
+                    sum(len(doclinks) for doclinks in links.values()), mirror, broken))
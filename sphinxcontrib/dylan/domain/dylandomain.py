@@ -6,7 +6,12 @@ Created by Dustin Voss on 2011-11-10.
 Copyright (c) 2011-2025 Dylan Hackers. All rights reserved.
 """
 
+import collections
+import functools
+import importlib
+import os
 import re
+import sys
 try:
     from urllib.parse import urljoin
 except ImportError:
@@ -22,28 +27,45 @@ from sphinx.domains import Domain, Index
 from sphinx.domains import ObjType
 from sphinx.directives import ObjectDescription
 from sphinx.roles import XRefRole
+from sphinx.util import logging
 from sphinx.util.docfields import Field, GroupedField, TypedField
 from sphinx.util.nodes import make_refnode
 
 
-from . import drmindex
+from .profiling import get_profile, timer
 
 
+logger = logging.getLogger(__name__)
+
 #
 # DRM link support
 #
 
 
+DRM_LINK_RE = re.compile(r'^(.*)\s<([^>]+)>$|^(.*)$', flags=re.DOTALL)
+
 def drm_link (name, rawtext, text, lineno, inliner, options={}, context=[]):
-    match = re.match(r'^(.*)\s<([^>]+)>$|^(.*)$', text, flags=re.DOTALL)
+    if not text.endswith('>'):
+        # Fast path: there is no explicit link key.
+        match = True
+        linktext, linkkey = None, text
+    else:
+        match = DRM_LINK_RE.match(text)
+        if match:
+            linktext, linkkey1, linkkey2 = match.groups()
+            linkkey = linkkey1 or linkkey2
     if match:
-        base_url = inliner.document.settings.env.app.config.dylan_drm_url
+        env = inliner.document.settings.env
+        base_url = env.app.config.dylan_drm_url
 
-        linktext, linkkey1, linkkey2 = match.groups()
-        linkkey = linkkey1 or linkkey2
         linktext = (linktext or linkkey).strip()
-        location = drmindex.lookup(linkkey)
-        href = urljoin(base_url, location)
+        domain = env.get_domain('dylan')
+        location = domain.drm_location(linkkey)
+        if env.app.config.dylan_drm_mirror:
+            # Checked against the mirror by drmmirror.py.
+            domain.data['drmlinks'].setdefault(env.docname, set()).add(
+                (linkkey, location, lineno))
+        href = urljoin(base_url, linkkey if location is None else location)
 
         options = docutils.parsers.rst.roles.normalized_role_options(options)
         textnode = RST_NODES.literal(rawtext, linktext, classes=['xref', 'drm'])
@@ -69,12 +91,15 @@ def get_current_library (env):
 
 def set_current_library (env, library):
     env.temp_data['dylan:library'] = library
+    # Copied to pending_xref nodes made by other domains' roles, e.g. :any:.
+    env.ref_context['dylan:library'] = library
 
 def get_current_module (env):
     return env.temp_data.get('dylan:module', None)
 
 def set_current_module (env, module):
     env.temp_data['dylan:module'] = module
+    env.ref_context['dylan:module'] = module
 
 
 def library_fullname (env, library):
@@ -110,9 +135,91 @@ def fullname_parts (fullname):
         return (None, None, None)
 
 
+WHITESPACE_RE = re.compile(r'\s')
+
+@functools.lru_cache(maxsize=65536)
 def name_to_id (name):
     name = name.replace('<', '[').replace('>', ']')
-    return re.sub(r'\s', '', name).lower()
+    return WHITESPACE_RE.sub('', name).lower()
+
+
+def object_sortkey (entry):
+    """Returns the API index sort key of an objects inventory entry, which sorts
+    by short name then by library/module name.
+    """
+    return "{0} {1}".format(entry.shortname, entry.fullname).lower()
+
+
+class DylanObject (object):
+    """
+    An entry in the domain's objects inventory. The full name is kept as a
+    library or library:module prefix plus the specname. Entries made by
+    from_fullname share their docname, objtype, displaytype and prefix strings
+    with other entries, so that the inventory is small in memory and in
+    environment.pickle. lineno is the line of the description in its document,
+    if known, for warnings.
+    """
+
+    __slots__ = ('docname', 'objtype', 'displaytype', 'prefix', 'shortname', 'specname',
+                 'lineno')
+
+    def __init__ (self, docname, objtype, displaytype, prefix, shortname, specname,
+                  lineno=None):
+        self.docname = docname
+        self.objtype = objtype
+        self.displaytype = displaytype
+        self.prefix = prefix
+        self.shortname = shortname
+        self.specname = specname
+        self.lineno = lineno
+
+    @classmethod
+    def from_fullname (cls, docname, objtype, displaytype, fullname, shortname, specname,
+                       lineno=None):
+        """Makes an entry for an object whose fullname ends in specname."""
+        prefix = fullname[:-len(specname) - 1] if len(fullname) > len(specname) else ''
+        if shortname == specname:
+            shortname = specname
+        return cls(sys.intern(docname), sys.intern(objtype), sys.intern(displaytype),
+                   sys.intern(prefix), shortname, specname, lineno)
+
+    @property
+    def fullname (self):
+        if self.prefix:
+            return self.prefix + ':' + self.specname
+        return self.specname
+
+    def __reduce__ (self):
+        return (DylanObject, (self.docname, self.objtype, self.displaytype,
+                              self.prefix, self.shortname, self.specname, self.lineno))
+
+    def __repr__ (self):
+        return 'DylanObject({0!r}, {1!r}, {2!r})'.format(self.fullname, self.objtype,
+                                                         self.docname)
+
+
+def make_object_table (fullids, *columns):
+    return DylanObjectTable(zip(fullids, map(DylanObject, *columns)))
+
+class DylanObjectTable (dict):
+    """
+    The domain's objects inventory, fullid -> DylanObject. It pickles as one
+    list per DylanObject slot rather than as one reduce call per entry, which
+    is both smaller and quicker to load and save.
+    """
+
+    __slots__ = ()
+
+    def __reduce__ (self):
+        entries = list(self.values())
+        columns = tuple([getattr(entry, slot) for entry in entries]
+                        for slot in DylanObject.__slots__)
+        return (make_object_table, (list(self.keys()),) + columns)
+
+
+def object_library (fullid):
+    """Returns the library ID of fullid: its first component."""
+    return fullid.partition(':')[0]
 
 
 class DylanCurrentLibrary (Directive):
@@ -145,6 +252,11 @@ class DylanCurrentModule (Directive):
         return []
 
 
+# (directive name, signature, options, current library, current module)
+#   -> (fullname, partial, dispname, annotations), least recently used first
+signature_cache = collections.OrderedDict()
+SIGNATURE_CACHE_SIZE = 65536
+
 # DylanDescDirective used to subclass DescDirective, which was deprecated and
 # then removed completely. Hence the "Desc" in the name, I suspect. It's a good
 # bet this should be called something like DylanObjectDescription or
@@ -193,6 +305,18 @@ class DylanDescDirective (ObjectDescription):
     optional_arguments = 0
     final_argument_whitespace = False
 
+    content_nodes = None
+    """
+    If not None, the nodes of the content, used instead of parsing
+    self.content. The dylan:bindings directive makes them from its records.
+    """
+
+    source_info = None
+    """
+    If not None, the (source, line) of the description, used instead of the
+    directive's. The dylan:bindings directive gives those of its records.
+    """
+
     def fullname (self, partial):
         """
         Subclasses return the full, qualified name of this language element,
@@ -200,16 +324,45 @@ class DylanDescDirective (ObjectDescription):
         """
         return partial
 
-    # https://www.sphinx-doc.org/en/master/extdev/domainapi.html#sphinx.directives.ObjectDescription.handle_signature
-    def handle_signature (self, sigs, signode):
-        signode['classes'].append('dylan-api')
+    def get_source_info (self):
+        if self.source_info is not None:
+            return self.source_info
+        return super(DylanDescDirective, self).get_source_info()
+
+    def parse_content_to_nodes (self, allow_section_headings=False):
+        if self.content_nodes is not None:
+            return self.content_nodes
+        return super(DylanDescDirective, self).parse_content_to_nodes(allow_section_headings)
+
+    def run (self):
+        profile = get_profile(self.env)
+        if profile is None:
+            return super(DylanDescDirective, self).run()
+        # Sphinx runs a subclass of the directive class, made by the domain.
+        directive_class = next(cls for cls in type(self).__mro__
+                               if cls.__module__ == __name__)
+        with profile.timer('directive ' + directive_class.__name__):
+            return super(DylanDescDirective, self).run()
+
+    # Options that may change the signature, besides annotations.
+    signature_options = ('library', 'module', 'specializer')
+
+    def signature_key (self, sigs):
+        env = self.state.document.settings.env
+        options = tuple((opt, self.options[opt])
+                        for opt in self.annotations + list(self.signature_options)
+                        if opt in self.options)
+        # The directive name, since Sphinx makes a new class for each domain.
+        return (self.name, sigs, options, get_current_library(env), get_current_module(env))
+
+    def signature_parts (self, sigs):
+        """Returns (fullname, partial, dispname, annotations) for sigs."""
         partial = sigs.strip()
         fullname = self.fullname(partial)
 
         # Language element name
         (library, module, binding) = fullname_parts(fullname)
         dispname = binding or module or library
-        signode += SPHINX_NODES.desc_name(dispname, dispname)
 
         # Annotations
         annotations = []
@@ -218,7 +371,25 @@ class DylanDescDirective (ObjectDescription):
                 annot = self.options[opt]
                 annotations.append((annot or opt).capitalize())
         annotations.append(self.display_name.capitalize())
-        annotlist = ' '.join(annotations)
+        return (fullname, partial, dispname, ' '.join(annotations))
+
+    # https://www.sphinx-doc.org/en/master/extdev/domainapi.html#sphinx.directives.ObjectDescription.handle_signature
+    def handle_signature (self, sigs, signode):
+        signode['classes'].append('dylan-api')
+        # Regenerated pages repeat the same signatures, so look the parts up
+        # in signature_cache. The nodes are made anew: that is quicker than
+        # deep-copying cached ones.
+        key = self.signature_key(sigs)
+        parts = signature_cache.get(key)
+        if parts is None:
+            parts = signature_cache[key] = self.signature_parts(sigs)
+            if len(signature_cache) > SIGNATURE_CACHE_SIZE:
+                signature_cache.popitem(last=False)
+        else:
+            signature_cache.move_to_end(key)
+        (fullname, partial, dispname, annotlist) = parts
+
+        signode += SPHINX_NODES.desc_name(dispname, dispname)
         signode += RST_NODES.Text(' ')
         signode += SPHINX_NODES.desc_annotation(annotlist, annotlist)
 
@@ -227,12 +398,15 @@ class DylanDescDirective (ObjectDescription):
 
     # https://www.sphinx-doc.org/en/master/extdev/domainapi.html#sphinx.directives.ObjectDescription.add_target_and_index
     def add_target_and_index (self, name_tuple, sigs, signode):
+        profile = get_profile(self.env)
+        if profile is not None:
+            profile.count('add_target_and_index')
+
         # note target
         fullname = name_tuple[0]
         shortname = name_tuple[1]
         specname = name_tuple[2]
         fullid = name_to_id(fullname)
-        specid = name_to_id(specname)
         if fullid not in self.state.document.ids:
             signode['names'].append(fullname)
             signode['ids'].append(fullid)
@@ -242,19 +416,23 @@ class DylanDescDirective (ObjectDescription):
             # Check if already defined
             inventory = self.env.domaindata['dylan']['objects']
             if fullid in inventory:
+                (source, line) = self.get_source_info()
                 self.state_machine.reporter.warning(
                     'Duplicate description of Dylan {0} {1}, other instance in {2}'
                         .format(self.objtype, fullname,
-                                self.env.doc2path(inventory[fullid][0])),
-                    line=self.lineno)
-
-            # Add target
-            inventory[fullid] = (self.env.docname, self.objtype,
-                                 fullname, shortname, specname, self.display_name)
-
-            # Add target by specname
-            fullids = self.env.domaindata['dylan']['fullids']
-            fullids.setdefault(specid, []).append(fullid)
+                                self.env.doc2path(inventory[fullid].docname)),
+                    source=source, line=line)
+                duplicates = self.env.domaindata['dylan']['duplicates']
+                duplicates.setdefault(self.env.docname, set()).add(fullid)
+
+            # Add target, also by specname
+            domain = self.env.get_domain('dylan')
+            domain.note_object(fullid, DylanObject.from_fullname(
+                self.env.docname, self.objtype, self.display_name,
+                fullname, shortname, specname, self.lineno))
+            if self.source_info is not None:
+                locations = domain.data['locations'].setdefault(self.env.docname, {})
+                locations[fullid] = '{0}:{1}'.format(*self.source_info)
 
         # add index
         indexentry = str(shortname)
@@ -428,6 +606,11 @@ class DylanClassDesc (DylanBindingDesc):
               names=('operations', 'methods', 'functions')),
     ] + DylanBindingDesc.doc_field_types
 
+    def add_target_and_index (self, name_tuple, sigs, signode):
+        super(DylanClassDesc, self).add_target_and_index(name_tuple, sigs, signode)
+        self.env.get_domain('dylan').note_superclasses(name_to_id(name_tuple[0]),
+                                                       superclass_targets(self.content))
+
 
 class DylanFunctionDesc (DylanBindingDesc):
     """A Dylan function, method, or generic function."""
@@ -589,6 +772,198 @@ class DylanMacroDesc (DylanBindingDesc):
     ] + DylanBindingDesc.doc_field_types
 
 
+#
+# Class hierarchy
+#
+
+
+SUPERCLASSES_FIELD_RE = re.compile(r'^(\s*):(?:supers|superclasses|super|superclass):(.*)$')
+BACKQUOTED_RE = re.compile(r'`([^`]+)`')
+
+def superclass_targets (content):
+    """
+    Returns the IDs of the classes named by the superclasses doc field in
+    content, the lines of a class directive, e.g. ("[object]", "mod:[mixin]")
+    for ":superclasses: :class:`<object>`, :class:`mod:<mixin>`".
+    """
+    text = None
+    for line in content:
+        if text is None:
+            match = SUPERCLASSES_FIELD_RE.match(line)
+            if match:
+                (indent, text) = (len(match.group(1)), [match.group(2)])
+        elif line.strip() and len(line) - len(line.lstrip()) > indent:
+            text.append(line)
+        else:
+            break
+    if text is None:
+        return ()
+    text = ' '.join(text)
+    names = BACKQUOTED_RE.findall(text)
+    if not names:
+        names = text.split(',')
+    targets = []
+    for name in names:
+        match = DESC_LINK_RE.match(name.strip())
+        if match:
+            (_, linkkey1, linkkey2) = match.groups()
+            targets.append(name_to_id(linkkey1 or linkkey2))
+    return tuple(targets)
+
+
+def transitive_closure (edges):
+    """
+    Returns {node: frozenset of the nodes reachable from it} for edges, a dict
+    of node -> (node, ...). A cycle is followed once around.
+    """
+    closure = {}
+
+    def reach (node):
+        found = closure.get(node)
+        if found is None:
+            closure[node] = frozenset()
+            found = set()
+            for next_node in edges.get(node, ()):
+                found.add(next_node)
+                found |= reach(next_node)
+            found = closure[node] = frozenset(found)
+        return found
+
+    for node in edges:
+        reach(node)
+    return closure
+
+
+class DylanClassGraph (object):
+    """
+    The class hierarchy of the documented classes, by fullid. A superclass
+    that is not documented here is kept by its target ID, e.g. "[object]".
+
+    parents and children map a class to the tuple of its direct superclasses
+    and subclasses; ancestors and descendants map it to the frozenset of all
+    of them.
+    """
+
+    def __init__ (self, superclasses, xref_index):
+        self.parents = {}
+        self.children = {}
+        for (fullid, targets) in superclasses.items():
+            (library, module, _) = (fullid.split(':', 2) + [None, None])[:3]
+            parents = tuple(xref_index.lookup(target, library, module) or target
+                            for target in targets)
+            self.parents[fullid] = parents
+            for parent in parents:
+                self.children.setdefault(parent, []).append(fullid)
+        self.children = dict((parent, tuple(sorted(children)))
+                             for (parent, children) in self.children.items())
+        self.ancestors = transitive_closure(self.parents)
+        self.descendants = transitive_closure(self.children)
+
+    def subgraph (self, fullids, ancestors=True, descendants=False):
+        """
+        Returns the sorted (class, (superclass, ...)) pairs of fullids and,
+        optionally, all their ancestors and descendants.
+        """
+        members = set(fullids)
+        for fullid in fullids:
+            if ancestors:
+                members |= self.ancestors.get(fullid, frozenset())
+            if descendants:
+                members |= self.descendants.get(fullid, frozenset())
+        return tuple((member, tuple(parent for parent in self.parents.get(member, ())
+                                    if parent in members))
+                     for member in sorted(members))
+
+
+#
+# Method tables
+#
+
+
+class dylan_method_table (RST_NODES.General, RST_NODES.Element):
+    """A method table, filled in by process_method_tables."""
+
+
+class dylan_inheritance_diagram (RST_NODES.General, RST_NODES.Element):
+    """An inheritance diagram, replaced by inheritance.process_inheritance_diagrams."""
+
+
+class DylanMethodTable (Directive):
+    """Lists the methods of a generic function, wherever they are documented."""
+
+    has_content = False
+    required_arguments = 1
+    optional_arguments = 0
+    final_argument_whitespace = False
+
+    def run (self):
+        env = self.state.document.settings.env
+        node = dylan_method_table()
+        node['target'] = name_to_id(self.arguments[0].strip())
+        node['library'] = get_current_library(env)
+        node['module'] = get_current_module(env)
+        node.source, node.line = self.state_machine.get_source_and_line(self.lineno)
+        return [node]
+
+
+def method_table (builder, fromdocname, domain, fullids):
+    """Returns a table of links to the methods fullids, by specializers and module."""
+    table = RST_NODES.table(classes=['dylan-method-table'])
+    tgroup = RST_NODES.tgroup(cols=2)
+    table += tgroup
+    tgroup += RST_NODES.colspec(colwidth=3)
+    tgroup += RST_NODES.colspec(colwidth=1)
+    head = RST_NODES.row()
+    for title in ('Method', 'Module'):
+        head += RST_NODES.entry('', RST_NODES.paragraph(text=title))
+    tgroup += RST_NODES.thead('', head)
+    body = RST_NODES.tbody()
+    for fullid in fullids:
+        entry = domain.data['objects'][fullid]
+        literal = RST_NODES.literal(entry.specname, entry.specname)
+        link = make_refnode(builder, fromdocname, entry.docname, fullid, literal)
+        row = RST_NODES.row()
+        row += RST_NODES.entry('', RST_NODES.paragraph('', '', link))
+        row += RST_NODES.entry('', RST_NODES.paragraph(text=entry.prefix))
+        body += row
+    tgroup += body
+    return table
+
+def qualify_id (target, library, module):
+    """
+    Returns target, with zero, one or two colons, as a lib:mod:name ID in the
+    current library and module, or None if they are not known.
+    """
+    colons = target.count(':')
+    if colons == 2:
+        return target
+    if library is None:
+        return None
+    if colons == 1:
+        return name_to_id(library) + ':' + target
+    if module is None:
+        return None
+    return name_to_id(library) + ':' + name_to_id(module) + ':' + target
+
+def process_method_tables (app, doctree, docname):
+    """Replaces each dylan_method_table in doctree with its table of methods."""
+    domain = app.env.get_domain('dylan')
+    for node in list(doctree.findall(dylan_method_table)):
+        (target, library, module) = (node['target'], node['library'], node['module'])
+        gfid = domain.xref_index.lookup(target, library, module)
+        if gfid is None:
+            # The generic function itself need not be documented; its methods
+            # then have the ID it would have in the current module.
+            gfid = qualify_id(target, library, module)
+        fullids = domain.dispatch_index.methods(gfid) if gfid else []
+        if not fullids:
+            logger.warning('No methods of Dylan generic function {0} are documented'
+                               .format(node['target']), location=node)
+            node.replace_self([])
+        else:
+            node.replace_self(method_table(app.builder, docname, domain, fullids))
+
+
 #
 # Dylan language indexing
 #
@@ -614,20 +989,54 @@ class DylanObjectsIndex (Index):
     shortname = "api"
 
     def generate (self, docnames=None):
+        # The domain keeps the results until its objects change.
+        cache = self.domain.index_cache
+        split = self.split_by()
+        cache_key = (self.name, frozenset(docnames) if docnames else None, split)
+        if cache_key not in cache:
+            with timer(self.domain.env, 'DylanObjectsIndex.generate'):
+                if split:
+                    cache[cache_key] = self.landing_content(split)
+                else:
+                    cache[cache_key] = self.generate_content(cache_key[1])
+        return cache[cache_key]
+
+    def split_by (self):
+        """
+        Returns the dylan_apiindex_split configurable, 'letter' or 'library',
+        when the index is split into pages for the HTML builder, else None.
+        """
+        app = self.domain.env.app
+        if app.builder is None or app.builder.format != 'html':
+            return None
+        return app.config.dylan_apiindex_split or None
+
+    def generate_content (self, docnames):
+        sorted_fullids = self.domain.sorted_fullids
+        if docnames is None:
+            return self.index_content(sorted_fullids)
+        inventory = self.domain.data['objects']
+        return self.index_content(fullid for fullid in sorted_fullids
+                                  if inventory[fullid].docname in docnames)
+
+    def index_content (self, fullids):
+        """
+        Returns the (content, collapse) index of fullids, given in the order
+        of the domain's sorted_fullids.
+        """
         # Dictionary of first letter -> array of entry records with that letter
         content = {}
 
-        # list of all objects, sorted by short name then by library/module name
-        objects = sorted(self.domain.data['objects'].items(),
-                         key=lambda kv: "{0} {1}".format(kv[1][3], kv[1][2]).lower())
+        inventory = self.domain.data['objects']
 
         # Add entries
         prev_shortname = ''
         prev_fullname = ''
         num_toplevels = 0
-        for (fullid, (docname, _, fullname, shortname, specname, displaytype)) in objects:
-            if docnames and docname not in docnames:
-                continue
+        for fullid in fullids:
+            entry = inventory[fullid]
+            docname = entry.docname
+            (fullname, shortname, specname) = (entry.fullname, entry.shortname, entry.specname)
 
             # Find index character; omit leading non-alphanumerics.
             indexchar = None
@@ -668,7 +1077,7 @@ class DylanObjectsIndex (Index):
                 # Keep track of how many top-level entries we have.
                 num_toplevels += 1
 
-            entries.append([indexname, subtype, docname, fullid, displaytype, "", ""])
+            entries.append([indexname, subtype, docname, fullid, entry.displaytype, "", ""])
             prev_shortname = shortname
             prev_fullname = fullname
 
@@ -682,6 +1091,83 @@ class DylanObjectsIndex (Index):
 
         return (content, collapse)
 
+    def page_name (self, key):
+        """Returns the name of the page of the split index for key."""
+        return 'dylan-{0}-{1}'.format(self.name, ''.join(
+            char if char.isalnum() or char in '-.' else '_{0:x}'.format(ord(char))
+            for char in key.lower()))
+
+    def split_pages (self, split):
+        """
+        Returns [(page name, key, content, collapse), ...] for the pages of the
+        index split by initial letter or by library. Every page is cut from
+        the one sorted list of objects.
+        """
+        cache = self.domain.index_cache
+        cache_key = (self.name, 'pages', split)
+        if cache_key in cache:
+            return cache[cache_key]
+        pages = []
+        with timer(self.domain.env, 'DylanObjectsIndex.split_pages'):
+            if split == 'library':
+                libraries = {}
+                for fullid in self.domain.sorted_fullids:
+                    libraries.setdefault(object_library(fullid), []).append(fullid)
+                for (library, fullids) in sorted(libraries.items()):
+                    (content, collapse) = self.index_content(fullids)
+                    pages.append((self.page_name(library), library, content, collapse))
+            else:
+                (content, collapse) = self.generate_content(None)
+                for (letter, entries) in content:
+                    pages.append((self.page_name(letter), letter, [(letter, entries)],
+                                  collapse))
+        cache[cache_key] = pages
+        return pages
+
+    def landing_content (self, split):
+        """Returns the (content, collapse) index of the pages of the split index."""
+        content = {}
+        for (pagename, key, pagecontent, _) in self.split_pages(split):
+            count = sum(1 for (_, entries) in pagecontent
+                        for entry in entries if entry[1] != 1)
+            extra = '1 object' if count == 1 else '{0} objects'.format(count)
+            content.setdefault(key[0].upper(), []).append(
+                [key, 0, pagename, '', extra, '', ''])
+        return (sorted(content.items()), False)
+
+
+def collect_apiindex_pages (app):
+    """
+    Returns the pages of the split API index for html-collect-pages, or writes
+    them in parallel and returns none if the builder writes in parallel.
+    """
+    domain = app.env.get_domain('dylan')
+    index = DylanObjectsIndex(domain)
+    split = index.split_by()
+    if not split:
+        return []
+    pages = []
+    for (pagename, key, content, collapse) in index.split_pages(split):
+        context = {
+            'indextitle': '{0}: {1}'.format(DylanObjectsIndex.localname, key),
+            'content': content,
+            'collapse_index': collapse,
+        }
+        pages.append((pagename, context, 'domainindex.html'))
+    if not app.builder.parallel_ok or len(pages) < 2:
+        return pages
+
+    def write_pages (chunk):
+        for (pagename, context, template) in chunk:
+            app.builder.handle_page(pagename, context, template)
+
+    from sphinx.util.parallel import ParallelTasks, make_chunks
+    tasks = ParallelTasks(app.parallel)
+    for chunk in make_chunks(pages, app.parallel):
+        tasks.add_task(write_pages, chunk)
+    tasks.join()
+    return []
+
 
 #
 # Dylan language cross-references
@@ -700,32 +1186,47 @@ class DylanXRefRole (XRefRole):
         return (title, target)
 
 
+# Role name -> pattern matching its text, with groups for the explicit title,
+# the explicit link key, or the bare link key.
+DESC_LINK_RES = {
+    'dylan:meth':  re.compile(r'^(.+)\s<(\S+\(.+\))>$|^(\S+\(.+\))$', flags=re.DOTALL),
+    'dylan:macro': re.compile(r'^(.+)\s<((?:define\s+)?\S+)>$|^((?:define\s+)?\S+)$',
+                              flags=re.DOTALL),
+}
+DESC_LINK_RE = re.compile(r'^(.+)\s<(\S+)>$|^(\S+)$', flags=re.DOTALL)
+
+# Role name -> DylanXRefRole, reused for every reference with that role.
+desc_link_roles = {}
+
 def desc_link (name, rawtext, text, lineno, inliner, options={}, context=[]):
     """
     Rebuild rawtext and text to avoid default escaping/parsing behavior. We
     use [] instead of <> in targets and the SUB character instead of < in the
     title.
     """
-    if name == 'dylan:meth':
-        match = re.match(r'^(.+)\s<(\S+\(.+\))>$|^(\S+\(.+\))$', text, flags=re.DOTALL)
-    elif name == 'dylan:macro':
-        match = re.match(r'^(.+)\s<((?:define\s+)?\S+)>$|^((?:define\s+)?\S+)$', text, flags=re.DOTALL)
+    pattern = DESC_LINK_RES.get(name)
+    if pattern is None and text and not WHITESPACE_RE.search(text):
+        # Fast path: a bare link key, which the pattern would match as is.
+        match = True
+        linktitle, linkkey = None, text
     else:
-        match = re.match(r'^(.+)\s<(\S+)>$|^(\S+)$', text, flags=re.DOTALL)
+        match = (pattern or DESC_LINK_RE).match(text)
+        if match:
+            linktitle, linkkey1, linkkey2 = match.groups()
+            linkkey = (linkkey1 or linkkey2)
 
     if match:
-        linktitle, linkkey1, linkkey2 = match.groups()
-        linkkey = (linkkey1 or linkkey2)
         if linktitle is None:
-            keyparts = linkkey.split(':')
-            linktitle = keyparts[-1]
+            linktitle = linkkey.rpartition(':')[2]
 
         esc_linktitle = linktitle.replace("<", "\x1A")
         targ_linkkey = name_to_id(linkkey)
-        new_text = "{0} <{1}>".format(esc_linktitle, targ_linkkey)
-        new_rawtext = ":{0}:`{1} <{2}>`".format(name, esc_linktitle, targ_linkkey)
+        new_text = esc_linktitle + " <" + targ_linkkey + ">"
+        new_rawtext = ":" + name + ":`" + new_text + "`"
 
-        do_xref = DylanXRefRole()
+        do_xref = desc_link_roles.get(name)
+        if do_xref is None:
+            do_xref = desc_link_roles[name] = DylanXRefRole()
         return do_xref(name, new_rawtext, new_text, lineno, inliner, options, context)
     else:
         msg = inliner.reporter.error(
@@ -736,6 +1237,132 @@ def desc_link (name, rawtext, text, lineno, inliner, options={}, context=[]):
         return [prb], [msg]
 
 
+#
+# Dylan language cross-reference resolution
+#
+
+
+class DylanXRefIndex (object):
+    """
+    Lookup tables for resolving a cross-reference target, which is an ID with
+    zero, one, or two colons, against the current library and module of the
+    reference. Built in one pass over the domain's objects and fullids tables.
+
+    scopes maps (library ID, module ID) to a table of binding IDs in that
+    module, and (library ID, None) to a table of module:binding IDs and module
+    IDs in that library. shortnames maps each specid that names exactly one
+    object to that object's fullid.
+    """
+
+    def __init__ (self, objects, fullids):
+        scopes = {}
+        for fullid in objects:
+            parts = fullid.split(':', 2)
+            if len(parts) > 1:
+                scopes.setdefault((parts[0], None), {})[fullid[len(parts[0]) + 1:]] = fullid
+            if len(parts) > 2:
+                scopes.setdefault((parts[0], parts[1]), {})[parts[2]] = fullid
+        self.objects = objects
+        self.scopes = scopes
+        self.shortnames = dict((specid, next(iter(targlist)))
+                               for (specid, targlist) in fullids.items()
+                               if len(targlist) == 1)
+
+    def lookup_scoped (self, target, library, module):
+        """
+        Returns the fullid of target as qualified by the current library and
+        module, or None.
+        """
+        colons = target.count(':')
+        if colons == 2:
+            return target if target in self.objects else None
+        if library is None:
+            return None
+        if colons == 1:
+            scope = (name_to_id(library), None)
+        elif colons == 0 and module is not None:
+            scope = (name_to_id(library), name_to_id(module))
+        else:
+            return None
+        return self.scopes.get(scope, {}).get(target)
+
+    def lookup_shortname (self, target):
+        """Returns the fullid of the only object with target as specid, or None."""
+        return self.shortnames.get(target)
+
+    def lookup (self, target, library, module):
+        """
+        Returns the fullid of target as qualified by the current library and
+        module, else of the uniquely-named object target, or None. Objects of
+        every type share these tables, so one lookup serves any role.
+        """
+        fullid = self.lookup_scoped(target, library, module)
+        if fullid is None and ':' not in target:
+            fullid = self.shortnames.get(target)
+        return fullid
+
+
+def split_specializers (text):
+    """Splits a method's specializer list on commas outside parentheses."""
+    parts = []
+    depth = 0
+    start = 0
+    for (i, char) in enumerate(text):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+def split_method_id (methodid):
+    """
+    Splits the ID of a method, e.g. "lib:mod:gf([integer],[object])", into its
+    generic function's ID and a tuple of its specializer IDs, e.g.
+    ("lib:mod:gf", ("[integer]", "[object]")). Returns (methodid, None) if it
+    has no specializers.
+    """
+    (gfid, paren, rest) = methodid.partition('(')
+    if not paren or not rest.endswith(')'):
+        return (methodid, None)
+    key = tuple(name_to_id(part) for part in split_specializers(rest[:-1]))
+    return (gfid, key)
+
+
+class DylanDispatchIndex (object):
+    """
+    The methods of each generic function, for listing them in method tables.
+    Built in one pass over the domain's fullids table, so without loading any
+    objects.
+
+    generics maps the ID of a generic function in the module of each method,
+    lib:mod:name, to [(specializer key, method fullid), ...] sorted by
+    specializers.
+    """
+
+    def __init__ (self, fullids):
+        self.generics = {}
+        for (specid, targlist) in fullids.items():
+            if '(' not in specid:
+                continue
+            for fullid in targlist:
+                (gfid, key) = split_method_id(fullid)
+                if key is not None:
+                    self.generics.setdefault(gfid, []).append((key, fullid))
+        for methods in self.generics.values():
+            methods.sort()
+
+    def methods (self, gfid):
+        """
+        Returns the fullids of the methods of the generic function whose fullid
+        is gfid, sorted by specializers.
+        """
+        return [fullid for (_, fullid) in self.generics.get(gfid, ())]
+
+
 #
 # Domain definition
 #
@@ -763,6 +1390,7 @@ class DylanDomain (Domain):
     directives = {
         'current-library':   DylanCurrentLibrary,
         'current-module':    DylanCurrentModule,
+        'method-table':      DylanMethodTable,
         'library':           DylanLibraryDesc,
         'module':            DylanModuleDesc,
         'class':             DylanClassDesc,
@@ -776,6 +1404,14 @@ class DylanDomain (Domain):
         'type':              DylanTypeDesc,
     }
 
+    # Directives imported when a document first uses them, so that projects
+    # without them never load their modules: name -> (module, class name).
+    lazy_directives = {
+        'autolibrary':          ('autodoc', 'DylanAutoLibrary'),
+        'automodule':           ('autodoc', 'DylanAutoModule'),
+        'inheritance-diagram':  ('inheritance', 'DylanInheritanceDiagram'),
+    }
+
     object_types = {
         'library':           ObjType('library', 'lib'),
         'module':            ObjType('module', 'mod'),
@@ -790,15 +1426,37 @@ class DylanDomain (Domain):
         'type':              ObjType('type', 'type'),
     }
 
+    data_version = 12
+
     initial_data = {
         'fullids': {},
-            # specid -> [fullid, ...]
+            # specid -> {fullid, ...}
             # fullid is fullname with <> replaced by [] and spaces removed
             # specid is the specname with <> replaced by [] and spaces removed
-        'objects': {},
-            # fullid -> (docname, objtype, fullname, shortname, specname, displaytype)
+        'objects': DylanObjectTable(),
+            # fullid -> DylanObject(docname, objtype, displaytype, prefix, shortname, specname,
+            #                       lineno)
             # fullid is fullname with <> replaced by [] and spaces removed
             # specname is the shortname plus specializer
+        'docobjects': {},
+            # docname -> {fullid, ...}
+            # the objects described by each document
+        'duplicates': {},
+            # docname -> {fullid, ...}
+            # fullids the document described again and was already warned about
+        'superclasses': {},
+            # class fullid -> (target ID, ...)
+            # the classes named by the class's superclasses doc field
+        'references': {},
+            # docname -> frozenset of reference keys, see dependencies.py
+            # the names the document refers to with Dylan roles
+        'drmlinks': {},
+            # docname -> {(link key, partial URL or None, line), ...}
+            # the document's DRM links, kept if dylan_drm_mirror is set
+        'locations': {},
+            # docname -> {fullid: "path:line", ...}
+            # where the document's objects described from other files, such
+            # as dylan:bindings records, are described
         'reflabels': {
             # label -> (docname, targetid)
             'dylan-apiindex': (name + DylanObjectsIndex.name,
@@ -810,13 +1468,284 @@ class DylanDomain (Domain):
         DylanObjectsIndex
     ]
 
+    xref_types = frozenset(['lib', 'mod', 'class', 'var', 'const', 'func', 'gf',
+                            'meth', 'macro', 'prim', 'type'])
+
+    # These objects go into the objects.inv which is used
+    # for intersphinx. This also feeds into tools like doc2dash
+    # which only expect a fairly standard set of object types.
+    inventory_types = {
+        'generic-function': 'function',
+        'primitive': 'function'
+    }
+
+    def __init__(self, env):
+        super(DylanDomain, self).__init__(env)
+        self._xref_index = None
+        self._sorted_fullids = None
+        self._dispatch_index = None
+        self._class_graph = None
+        self._inventory = None
+        self._drm_index = None
+        self._federation_index = None
+        self.index_cache = {}
+        self._cleared = {}
+            # fullid -> docname of objects cleared during this build, and not
+            # noted again in the same document since
+        self._changed = set()
+            # fullids of objects noted during this build that are new or moved
+        self._cleared_superclasses = {}
+            # fullid -> superclass targets of classes cleared during this build,
+            # and not noted again since
+        self._changed_superclasses = set()
+            # fullids of classes whose superclass targets changed during this build
+
+    @property
+    def drm_index(self):
+        """The DRM link index per the dylan_drm_index* configurables."""
+        if self._drm_index is None:
+            # Imported here, so that builds without DRM links never load the
+            # built-in index.
+            from . import drmindex
+            config = self.env.app.config
+            path = config.dylan_drm_index
+            if path:
+                path = os.path.join(self.env.app.confdir, path)
+            try:
+                index = drmindex.get_index(path, config.dylan_drm_index_extra)
+                # Reads the file now, so that a missing or corrupt one is
+                # reported here rather than at the first DRM link.
+                index.get('')
+            except (OSError, ValueError) as error:
+                logger.warning('Cannot read DRM index {0}, using the built-in index: {1}'
+                               .format(path, error))
+                index = drmindex.get_index(None, config.dylan_drm_index_extra)
+            self._drm_index = index
+        return self._drm_index
+
+    def directive(self, name):
+        if name not in self.directives and name in self.lazy_directives:
+            (module, directive) = self.lazy_directives[name]
+            module = importlib.import_module('.' + module, __package__)
+            self.directives[name] = getattr(module, directive)
+        return super(DylanDomain, self).directive(name)
+
+    def drm_location(self, key):
+        """The partial URL of DRM link key, or None if it is not in the index."""
+        from . import drmindex
+        return self.drm_index.get(drmindex.normalize_key(key))
+
+    @property
+    def federation_index(self):
+        """
+        A DylanXRefIndex of other projects' objects per the dylan_federation
+        configurable, or None.
+        """
+        if self._federation_index is None:
+            from . import federation
+            inventory = federation.load_federation(
+                self.env, self.env.app.config.dylan_federation, name_to_id)
+            self._federation_index = (inventory and DylanXRefIndex(inventory, inventory.fullids)
+                                      or False)
+        return self._federation_index or None
+
+    def objects_changed(self):
+        """Discards everything derived from the objects inventory."""
+        self._xref_index = None
+        self._sorted_fullids = None
+        self._dispatch_index = None
+        self._class_graph = None
+        self._inventory = None
+        self.index_cache.clear()
+
+    @property
+    def xref_index(self):
+        """
+        The DylanXRefIndex for the current objects, built on first use after
+        they change, i.e. once after the read phase.
+        """
+        if self._xref_index is None:
+            self._xref_index = DylanXRefIndex(self.data['objects'], self.data['fullids'])
+        return self._xref_index
+
+    @property
+    def sorted_fullids(self):
+        """
+        The fullids of the current objects in API index order, see
+        object_sortkey, sorted on first use after the objects change, like
+        xref_index.
+        """
+        if self._sorted_fullids is None:
+            objects = self.data['objects']
+            self._sorted_fullids = sorted(objects,
+                                          key=lambda fullid: (object_sortkey(objects[fullid]),
+                                                              fullid))
+        return self._sorted_fullids
+
+    @property
+    def dispatch_index(self):
+        """
+        The DylanDispatchIndex for the current objects, built on first use
+        after they change, like xref_index.
+        """
+        if self._dispatch_index is None:
+            self._dispatch_index = DylanDispatchIndex(self.data['fullids'])
+        return self._dispatch_index
+
+    @property
+    def class_graph(self):
+        """
+        The DylanClassGraph for the current classes, built on first use after
+        the objects change, like xref_index.
+        """
+        if self._class_graph is None:
+            self._class_graph = DylanClassGraph(self.data['superclasses'], self.xref_index)
+        return self._class_graph
+
+    @property
+    def inventory(self):
+        """
+        The get_objects entries for the current objects, with their types
+        remapped per inventory_types and in the order Sphinx sorts them, built
+        on first use after the objects change.
+        """
+        if self._inventory is None:
+            remap = self.inventory_types
+            self._inventory = sorted(
+                (entry.shortname, entry.specname, remap.get(entry.objtype, entry.objtype),
+                 entry.docname, fullid, 0)
+                for (fullid, entry) in self.data['objects'].items())
+        return self._inventory
+
+    def note_object(self, fullid, entry):
+        """
+        Adds entry to the objects inventory under fullid, replacing any other
+        description of the same object, and keeps the fullids and docobjects
+        tables in step with it.
+        """
+        self.objects_changed()
+        inventory = self.data['objects']
+        docname = entry.docname
+        if fullid in inventory:
+            other_docname = inventory[fullid].docname
+            if other_docname != docname:
+                self.data['docobjects'].get(other_docname, set()).discard(fullid)
+                self._changed.add(fullid)
+        elif self._cleared.pop(fullid, None) != docname:
+            self._changed.add(fullid)
+        inventory[fullid] = entry
+        self.data['docobjects'].setdefault(docname, set()).add(fullid)
+        self.data['fullids'].setdefault(name_to_id(entry.specname), set()).add(fullid)
+
+    def note_superclasses(self, fullid, targets):
+        """Notes the superclass targets of the class fullid."""
+        self.objects_changed()
+        cleared = self._cleared_superclasses.pop(fullid, None)
+        previous = self.data['superclasses'].get(fullid, cleared)
+        if tuple(targets or ()) != tuple(previous or ()):
+            self._changed_superclasses.add(fullid)
+        if targets:
+            self.data['superclasses'][fullid] = targets
+        else:
+            self.data['superclasses'].pop(fullid, None)
+
     def clear_doc(self, docname):
-        for fullid, (objects_docname, _, _, _, specname, _) in list(self.data['objects'].items()):
-            if objects_docname == docname:
-                del self.data['objects'][fullid]
-                specid = name_to_id(specname)
-                if fullid in self.data['fullids'].get(specid, {}):
-                    self.data['fullids'][specid].remove(fullid)
+        with timer(self.env, 'clear_doc'):
+            self._clear_doc(docname)
+
+    def _clear_doc(self, docname):
+        self.objects_changed()
+        inventory = self.data['objects']
+        fullids = self.data['fullids']
+        superclasses = self.data['superclasses']
+        for fullid in self.data['docobjects'].pop(docname, ()):
+            entry = inventory.pop(fullid)
+            targets = superclasses.pop(fullid, None)
+            if targets:
+                self._cleared_superclasses[fullid] = targets
+            self._cleared[fullid] = docname
+            specid = name_to_id(entry.specname)
+            targlist = fullids.get(specid)
+            if targlist is not None:
+                targlist.discard(fullid)
+                if not targlist:
+                    del fullids[specid]
+        self.data['duplicates'].pop(docname, None)
+        self.data['references'].pop(docname, None)
+        self.data['drmlinks'].pop(docname, None)
+        self.data['locations'].pop(docname, None)
+
+    def changed_objects(self):
+        """
+        Returns the fullids of the objects added, removed or moved to another
+        document by the documents read in this build.
+        """
+        return self._changed | set(self._cleared)
+
+    def changed_superclasses(self):
+        """
+        Returns the fullids of the classes whose superclass targets were added,
+        removed or changed by the documents read in this build.
+        """
+        return self._changed_superclasses | set(self._cleared_superclasses)
+
+    # https://www.sphinx-doc.org/en/master/extdev/domainapi.html#sphinx.domains.Domain.merge_domaindata
+    def merge_domaindata(self, docnames, otherdata):
+        """
+        Merge in the objects described by docnames, as read by a parallel
+        reader process. The reader has already warned about duplicates of the
+        objects it could see, and noted them in 'duplicates'; any other
+        duplicate was read by another reader and is reported here.
+        """
+        profile = get_profile(self.env)
+        if profile is not None and otherdata.get('profile') is not None:
+            profile.merge(otherdata['profile'])
+
+        inventory = self.data['objects']
+        for docname in docnames:
+            reported = otherdata['duplicates'].get(docname, set())
+            if reported:
+                self.data['duplicates'][docname] = reported
+            if docname in otherdata['references']:
+                self.data['references'][docname] = otherdata['references'][docname]
+            if docname in otherdata['drmlinks']:
+                self.data['drmlinks'][docname] = otherdata['drmlinks'][docname]
+            locations = otherdata['locations'].get(docname, {})
+            if locations:
+                self.data['locations'][docname] = locations
+            for fullid in otherdata['docobjects'].get(docname, ()):
+                entry = otherdata['objects'][fullid]
+                if fullid in inventory and fullid not in reported:
+                    logger.warning(
+                        'Duplicate description of Dylan {0} {1}, other instance in {2}'
+                            .format(entry.objtype, entry.fullname,
+                                    self.env.doc2path(inventory[fullid].docname)),
+                        location=locations.get(fullid, (docname, entry.lineno)))
+                self.note_object(fullid, entry)
+                self.note_superclasses(fullid, otherdata['superclasses'].get(fullid))
+
+    def lookup_target(self, target, library, module):
+        """
+        Looks up a normalized target for resolve_xref and resolve_any_xref:
+        qualified by the current library and module, else as the unique short
+        name, else the same ways in other projects' objects. Returns (fullid,
+        None) for a local object, (None, fullid) for a federated one, or (None,
+        None), and counts the outcome in the build profile.
+        """
+        index = self.xref_index
+        outcome = 'scoped'
+        fullid = index.lookup_scoped(target, library, module)
+        if fullid is None and ':' not in target:
+            outcome = 'shortname'
+            fullid = index.lookup_shortname(target)
+        federated = None
+        if fullid is None and self.federation_index is not None:
+            outcome = 'federated'
+            federated = self.federation_index.lookup(target, library, module)
+        profile = get_profile(self.env)
+        if profile is not None:
+            profile.count('resolve_xref ' + (outcome if fullid or federated else 'miss'))
+        return (fullid, federated)
 
     def resolve_xref(self, env, fromdocname, builder, typ, target, node, contnode):
         if typ == 'ref':
@@ -826,62 +1755,41 @@ class DylanDomain (Domain):
                 targetid = nodeargs[1]
                 return make_refnode(builder, fromdocname, todocname, targetid, contnode)
 
-        if typ in ['lib', 'mod', 'class', 'var', 'const', 'func', 'gf', 'meth', 'macro', 'type']:
+        if typ in self.xref_types:
             # Target will have been transformed to the standard ID format:
             # no spaces and <> changed to []. Additionally, the node will have
             # dylan_curlibrary and dylan_curmodule set if possible. This is all
             # done by the role processing function and the DylanXRefRole class.
-            colons = target.count(':')
-            fulltarget = None
-
-            if hasattr(node, "dylan_curlibrary"):
-                library = node.dylan_curlibrary
-            else:
-                library = None
-
-            if hasattr(node, "dylan_curmodule"):
-                module = node.dylan_curmodule
-            else:
-                module = None
-
-            # Use current library and module
-            if colons == 2:
-                fulltarget = target
-            elif library is not None:
-                library_id = name_to_id(library)
-                if colons == 1:
-                    fulltarget = "{0}:{1}".format(library_id, target)
-                elif module is not None:
-                    module_id = name_to_id(module)
-                    if colons == 0:
-                        fulltarget = "{0}:{1}:{2}".format(library_id, module_id, target)
-
-            # Fetch link info based on current library and module and passed target
-            nodeargs = self.data['objects'].get(fulltarget, None)
-
-            # Can't find it that way; check the unique shortname list
-            if nodeargs is None and colons == 0:
-                targlist = self.data['fullids'].get(target, [])
-                if len(targlist) == 1:
-                    fulltarget = targlist[0]
-                    nodeargs = self.data['objects'].get(fulltarget, None)
+            library = getattr(node, 'dylan_curlibrary', None)
+            module = getattr(node, 'dylan_curmodule', None)
+            (fulltarget, federated) = self.lookup_target(target, library, module)
 
             # Found it; make a link.
-            if nodeargs is not None:
-                todocname = nodeargs[0]
+            if fulltarget is not None:
+                todocname = self.data['objects'][fulltarget].docname
                 return make_refnode(builder, fromdocname, todocname, fulltarget, contnode)
+            if federated is not None:
+                return self.federation_index.objects.make_reference(federated, contnode)
 
         return None
 
+    # https://www.sphinx-doc.org/en/master/extdev/domainapi.html#sphinx.domains.Domain.resolve_any_xref
+    def resolve_any_xref(self, env, fromdocname, builder, target, node, contnode):
+        # Unlike our own roles, target has not been normalized, and the current
+        # library and module come from the reference context.
+        (fulltarget, federated) = self.lookup_target(name_to_id(target),
+                                                     node.get('dylan:library'),
+                                                     node.get('dylan:module'))
+        if fulltarget is not None:
+            entry = self.data['objects'][fulltarget]
+            role = 'dylan:' + self.role_for_objtype(entry.objtype)
+            return [(role, make_refnode(builder, fromdocname, entry.docname, fulltarget,
+                                        contnode))]
+        if federated is not None:
+            objects = self.federation_index.objects
+            role = 'dylan:' + self.role_for_objtype(objects.objtype(federated))
+            return [(role, objects.make_reference(federated, contnode))]
+        return []
+
     def get_objects(self):
-        # These objects go into the objects.inv which is used
-        # for intersphinx. This also feeds into tools like doc2dash
-        # which only expect a fairly standard set of object types.
-        REMAP_TYPES = {
-            'generic-function': 'function',
-            'primitive': 'function'
-        }
-        for kv in self.data['objects'].items():
-            (fullid, (docname, objtype, fullname, shortname, specname, displaytype)) = kv
-            objtype = REMAP_TYPES.get(objtype, objtype)
-            yield (shortname, specname, objtype, docname, fullid, 0)
+        return iter(self.inventory)
@@ -0,0 +1,136 @@
+# encoding: utf-8
+"""
+federation.py
+
+Resolves Dylan cross-references that the local objects cannot against the
+Dylan inventories of other Sphinx projects, given as local objects.inv files
+or directories of them by the dylan_federation configurable. Each inventory
+is parsed once and cached, pre-parsed, in the doctree directory until the
+file changes.
+
+Copyright (c) 2011-2025 Dylan Hackers. All rights reserved.
+"""
+
+import glob
+import os
+import re
+import zlib
+
+import docutils.nodes as RST_NODES
+
+from sphinx.util import logging
+
+from ..diskcache import get_cache
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached form changes.
+CACHE_VERSION = 1
+
+INVENTORY_HEADER = b'# Sphinx inventory version 2'
+
+LINE_RE = re.compile(r'(.+?)\s+(\S+)\s+(-?\d+)\s+?(\S*)\s+(.*)')
+
+
+def parse_inventory (path):
+    """
+    Returns the Dylan objects of the objects.inv-format file at path as
+    (fullids, specnames, objtypes, uris) lists, where each URI is relative to
+    the project's base URI.
+    """
+    with open(path, 'rb') as stream:
+        data = stream.read()
+    lines = data.split(b'\n', 4)
+    if len(lines) < 5 or lines[0].rstrip() != INVENTORY_HEADER:
+        raise ValueError('not a Sphinx version 2 inventory')
+    columns = ([], [], [], [])
+    for line in zlib.decompress(lines[4]).decode('utf-8').splitlines():
+        match = LINE_RE.match(line.rstrip())
+        if match is None:
+            continue
+        (name, objtype, _, uri, dispname) = match.groups()
+        if not objtype.startswith('dylan:'):
+            continue
+        if uri.endswith('$'):
+            uri = uri[:-1] + name
+        fullid = uri.partition('#')[2]
+        if not fullid:
+            continue
+        columns[0].append(fullid)
+        columns[1].append(name if dispname == '-' else dispname)
+        columns[2].append(objtype[len('dylan:'):])
+        columns[3].append(uri)
+    return columns
+
+
+class FederatedInventory (object):
+    """
+    The Dylan objects of other projects, read-only. It has the lookup methods
+    of the domain's objects table that DylanXRefIndex uses, so the domain
+    looks targets up in it the same way it does its own objects.
+    """
+
+    def __init__ (self):
+        self.entries = {}
+            # fullid -> (project, refuri, specname, objtype)
+        self.fullids = {}
+            # specid -> {fullid, ...}
+
+    def add (self, project, base_uri, columns, name_to_id):
+        """Adds the objects of a parsed inventory, unless already known."""
+        base_uri = base_uri.rstrip('/') + '/'
+        for (fullid, specname, objtype, uri) in zip(*columns):
+            if fullid in self.entries:
+                continue
+            self.entries[fullid] = (project, base_uri + uri, specname, objtype)
+            self.fullids.setdefault(name_to_id(specname), set()).add(fullid)
+
+    def __iter__ (self):
+        return iter(self.entries)
+
+    def __contains__ (self, fullid):
+        return fullid in self.entries
+
+    def __len__ (self):
+        return len(self.entries)
+
+    def objtype (self, fullid):
+        return self.entries[fullid][3]
+
+    def make_reference (self, fullid, contnode):
+        (project, refuri, specname, _) = self.entries[fullid]
+        node = RST_NODES.reference('', '', internal=False, refuri=refuri,
+                                   reftitle='{0} (in {1})'.format(specname, project))
+        node.append(contnode)
+        return node
+
+
+def inventory_paths (path):
+    """Returns the inventory files at path: the file, or those in the directory."""
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, '*.inv')) +
+                      glob.glob(os.path.join(path, '*', 'objects.inv')))
+    return [path]
+
+def load_federation (env, projects, name_to_id):
+    """
+    Returns a FederatedInventory of the projects named in projects, a dict of
+    project name -> (base URI, inventory file or directory), or None if there
+    are none. Earlier projects, in name order, take precedence.
+    """
+    if not projects:
+        return None
+    cache = get_cache(env, 'dylan-federation', CACHE_VERSION)
+    federation = FederatedInventory()
+    for (project, (base_uri, location)) in sorted(projects.items()):
+        location = os.path.join(env.app.confdir, location)
+        for path in inventory_paths(location):
+            try:
+                columns = cache.load_file(path, parse_inventory)
+            except (OSError, ValueError, zlib.error, UnicodeDecodeError) as error:
+                logger.warning('Cannot load Dylan inventory {0} of {1}: {2}'
+                               .format(path, project, error))
+                continue
+            federation.add(project, base_uri, columns, name_to_id)
+    return federation
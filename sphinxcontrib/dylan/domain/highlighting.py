@@ -0,0 +1,197 @@
+# encoding: utf-8
+"""
+highlighting.py
+
+A Pygments lexer for Dylan code blocks, and a cache of their highlighted
+output. The same examples recur across a library's reference pages, so the
+output of the builder's highlighter for Dylan is memoized by a hash of the
+source and the highlighting options, in memory and in the doctree directory
+across builds.
+
+Copyright (c) 2011-2025 Dylan Hackers. All rights reserved.
+"""
+
+import hashlib
+
+import pygments
+import sphinx
+
+from pygments.lexer import RegexLexer, bygroups
+from pygments.token import (Comment, Keyword, Name, Number, Operator, Punctuation,
+                            String, Text, Whitespace)
+
+from ..diskcache import get_cache
+
+
+#
+# Lexer
+#
+
+
+# Bump when the lexer's tokens change, to invalidate cached output.
+LEXER_VERSION = 1
+
+NAME = r'[\w!&*<>|^$%@?+~=/-]+'
+
+DEFINERS = ('class', 'generic', 'method', 'function', 'constant', 'variable',
+            'macro', 'library', 'module', 'domain',
+            'C-function', 'C-struct', 'C-union', 'C-pointer-type', 'C-subtype',
+            'C-mapped-subtype', 'C-callable-wrapper', 'C-variable', 'C-address',
+            'interface', 'table', 'test', 'suite', 'benchmark')
+
+DEFINER_NAMES = {
+    'class': Name.Class,
+    'constant': Name.Constant,
+    'variable': Name.Variable.Global,
+    'library': Name.Namespace,
+    'module': Name.Namespace,
+    'macro': Name.Function.Magic,
+}
+
+KEYWORDS = frozenset((
+    'above', 'afterwards', 'begin', 'below', 'block', 'by', 'case', 'cleanup',
+    'create', 'define', 'else', 'elseif', 'end', 'exception', 'exclude',
+    'export', 'finally', 'for', 'from', 'handler', 'if', 'import', 'in',
+    'keyword', 'let', 'local', 'method', 'otherwise', 'prefix', 'rename',
+    'required', 'select', 'signal', 'slot', 'then', 'to', 'unless', 'until',
+    'use', 'when', 'while'))
+
+OPERATORS = frozenset((
+    '=', '==', '~=', '~==', '<', '>', '<=', '>=', '+', '-', '*', '/', '^', '&',
+    '|', '~', '=>'))
+
+ADJECTIVES = ('abstract', 'concrete', 'constant', 'dynamic', 'each-subclass',
+              'exported', 'free', 'functional', 'inline', 'inline-only',
+              'instance', 'may-inline', 'not-inline', 'open', 'primary',
+              'sealed', 'sideways', 'subclass', 'thread', 'variable', 'virtual')
+
+
+def define_form (lexer, match):
+    """Yields the tokens of a define form, typing the name by its definer."""
+    yield (match.start(1), Keyword, match.group(1))
+    yield (match.start(2), Whitespace, match.group(2))
+    if match.group(3):
+        yield (match.start(3), Keyword.Declaration, match.group(3))
+    yield (match.start(4), Keyword, match.group(4))
+    yield (match.start(5), Whitespace, match.group(5))
+    yield (match.start(6), DEFINER_NAMES.get(match.group(4), Name.Function), match.group(6))
+
+def word (lexer, match):
+    """
+    Yields the token of a name, typing it by its spelling. One rule and a set
+    lookup is quicker than a rule per kind of name.
+    """
+    text = match.group()
+    if text[-1] == ':':
+        token = String.Symbol
+    elif text in KEYWORDS:
+        token = Keyword
+    elif text in OPERATORS:
+        token = Operator
+    elif len(text) > 2 and text[0] == '<' and text[-1] == '>':
+        token = Name.Class
+    elif text[0] == '$':
+        token = Name.Constant
+    elif len(text) > 2 and text[0] == '*' and text[-1] == '*':
+        token = Name.Variable.Global
+    else:
+        token = Name
+    yield (match.start(), token, text)
+
+
+class DylanLexer (RegexLexer):
+    """
+    Lexes Dylan source: define forms and their names, <class>, $constant and
+    *variable* names, keywords, #-words, symbols, strings and numbers. Any
+    other character is Text, so the lexer never reports an error.
+    """
+
+    name = 'Dylan'
+    aliases = ['dylan']
+    filenames = ['*.dylan', '*.dyl', '*.intr']
+    mimetypes = ['text/x-dylan']
+
+    tokens = {
+        'root': [
+            (r'\s+', Whitespace),
+            (r'//.*?$', Comment.Single),
+            (r'/\*', Comment.Multiline, 'comment'),
+            (r'(define)(\s+)((?:(?:%s)\s+)*)(%s)(\s+)(%s)' % (
+                '|'.join(ADJECTIVES), '|'.join(DEFINERS), NAME), define_form),
+            (r'(end)(\s+)(%s)(?![\w-])' % '|'.join(DEFINERS),
+             bygroups(Keyword, Whitespace, Keyword)),
+            (r'[-+]?\d[\d_]*(\.[\d_]+)?([eEdDsS][-+]?\d+)?', Number),
+            (r'\?\??(?:%s)?(?::%s)?' % (NAME, NAME), Name.Variable),
+            (r'%s(?::(?!:))?' % NAME, word),
+            (r'#"(\\\\|\\"|[^"])*"', String.Symbol),
+            (r'"(\\\\|\\"|[^"])*"', String),
+            (r"'(\\.|\\<[0-9a-fA-F]+>|[^'\\])'", String.Char),
+            (r'#x[0-9a-fA-F_]+', Number.Hex),
+            (r'#o[0-7_]+', Number.Oct),
+            (r'#b[01_]+', Number.Bin),
+            (r'#(?:t|f)(?![\w-])', Keyword.Constant),
+            (r'#[(\[]', Punctuation),
+            (r'#%s' % NAME, Keyword),
+            (r'\\' + NAME, Name),
+            (r':=|::', Operator),
+            (r'[()\[\]{},;.:]', Punctuation),
+            (r'.', Text),
+        ],
+        'comment': [
+            (r'[^*/]+', Comment.Multiline),
+            (r'/\*', Comment.Multiline, '#push'),
+            (r'\*/', Comment.Multiline, '#pop'),
+            (r'[*/]', Comment.Multiline),
+        ],
+    }
+
+
+#
+# Highlighting cache
+#
+
+
+def highlight_key (bridge, source, lang, opts, force, kwargs):
+    """
+    Returns the cache name of the output of a Dylan code block: a hash of the
+    source and everything else that affects the output.
+    """
+    options = repr((pygments.__version__, sphinx.__version__,
+                    bridge.dest, bridge.formatter.__name__,
+                    sorted(bridge.formatter_args.items(), key=repr),
+                    lang, sorted((opts or {}).items()), force,
+                    sorted(kwargs.items())))
+    digest = hashlib.sha256(options.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(source.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def memoize_highlighter (bridge, cache):
+    """Wraps bridge.highlight_block to look up Dylan code blocks in cache."""
+    highlight_block = bridge.highlight_block
+
+    def memoized_highlight_block (source, lang, opts=None, force=False, location=None,
+                                  **kwargs):
+        if lang not in DylanLexer.aliases or not isinstance(source, str):
+            return highlight_block(source, lang, opts, force, location, **kwargs)
+        return cache.load(highlight_key(bridge, source, lang, opts, force, kwargs), None,
+                          lambda: highlight_block(source, lang, opts, force, location,
+                                                  **kwargs))
+
+    bridge.highlight_block = memoized_highlight_block
+
+
+#
+# Sphinx event handlers
+#
+
+
+def builder_inited (app):
+    bridge = getattr(app.builder, 'highlighter', None)
+    if bridge is not None:
+        memoize_highlighter(bridge, get_cache(app.env, 'dylan-highlight', LEXER_VERSION))
+
+def setup (app):
+    app.add_lexer('dylan', DylanLexer)
+    app.connect('builder-inited', builder_inited)
@@ -0,0 +1,136 @@
+# encoding: utf-8
+"""
+inheritance.py
+
+The dylan:inheritance-diagram directive, which draws the superclasses (and
+optionally subclasses) of Dylan classes with sphinx.ext.graphviz, which the
+project must load itself. The dot source depends only on the classes shown and
+their links, which are relative to the document, so an unchanged hierarchy
+drawn again in the same directory has the same content hash and graphviz
+reuses the image it rendered before.
+
+Copyright (c) 2011-2025 Dylan Hackers. All rights reserved.
+"""
+
+import docutils.nodes as RST_NODES
+import docutils.parsers.rst.directives as DIRECTIVES
+
+from docutils.parsers.rst import Directive
+from sphinx.util import logging
+
+from .dylandomain import (dylan_inheritance_diagram, get_current_library, get_current_module,
+                          name_to_id)
+
+
+logger = logging.getLogger(__name__)
+
+
+class DylanInheritanceDiagram (Directive):
+    """Draws the class hierarchy of one or more Dylan classes."""
+
+    has_content = False
+    required_arguments = 1
+    optional_arguments = 0
+    final_argument_whitespace = True
+
+    option_spec = {
+        'descendants': DIRECTIVES.flag,
+        'no-ancestors': DIRECTIVES.flag,
+        'caption': DIRECTIVES.unchanged,
+    }
+
+    def run (self):
+        env = self.state.document.settings.env
+        if 'sphinx.ext.graphviz' not in env.app.extensions:
+            logger.warning('dylan:inheritance-diagram requires sphinx.ext.graphviz in extensions',
+                           location=(env.docname, self.lineno))
+            return []
+        node = dylan_inheritance_diagram()
+        node['targets'] = [name_to_id(name) for name in self.arguments[0].split()]
+        node['library'] = get_current_library(env)
+        node['module'] = get_current_module(env)
+        node['ancestors'] = 'no-ancestors' not in self.options
+        node['descendants'] = 'descendants' in self.options
+        node.source, node.line = self.state_machine.get_source_and_line(self.lineno)
+        if 'caption' not in self.options:
+            return [node]
+        caption = self.options['caption']
+        figure = RST_NODES.figure('', node)
+        figure += RST_NODES.caption(caption, caption)
+        self.state.document.set_id(figure)
+        return [figure]
+
+
+def class_label (classid):
+    """Returns the name of a class from its fullid or target ID."""
+    return classid.rpartition(':')[2].replace('[', '<').replace(']', '>')
+
+def quote (text):
+    return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def dot_code (subgraph, highlighted, urls):
+    """
+    Returns the dot source of a subgraph of the class graph, drawing the
+    classes in highlighted in bold and linking classes to urls.
+    """
+    lines = ['digraph "dylan-inheritance" {',
+             '  rankdir=BT;',
+             '  node [shape=box, fontname="sans-serif", fontsize=10, height=0.25];',
+             '  edge [arrowhead=empty];']
+    for (classid, _) in subgraph:
+        attributes = ['label=' + quote(class_label(classid))]
+        if classid in urls:
+            attributes.append('URL=' + quote(urls[classid]))
+            attributes.append('target="_top"')
+            attributes.append('tooltip=' + quote(classid))
+        if classid in highlighted:
+            attributes.append('style=bold')
+        lines.append('  {0} [{1}];'.format(quote(classid), ', '.join(attributes)))
+    for (classid, parents) in subgraph:
+        for parent in parents:
+            lines.append('  {0} -> {1};'.format(quote(classid), quote(parent)))
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def process_inheritance_diagrams (app, doctree, docname):
+    """Replaces each dylan_inheritance_diagram in doctree with a graphviz node."""
+    # Imported here, so that projects without sphinx.ext.graphviz never load it.
+    # They never get here either, since the directive warns instead of making
+    # diagrams for them.
+    from sphinx.ext.graphviz import graphviz
+    domain = app.env.get_domain('dylan')
+    for node in list(doctree.findall(dylan_inheritance_diagram)):
+        graph = domain.class_graph
+        classes = []
+        for target in node['targets']:
+            fullid = domain.xref_index.lookup(target, node['library'], node['module'])
+            if fullid is None:
+                logger.warning('Cannot find Dylan class {0} for inheritance diagram'
+                                   .format(target), location=node)
+            else:
+                classes.append(fullid)
+        if not classes:
+            node.replace_self([])
+            continue
+
+        subgraph = graph.subgraph(classes, node['ancestors'], node['descendants'])
+        urls = {}
+        objects = domain.data['objects']
+        for (classid, _) in subgraph:
+            entry = objects.get(classid)
+            if entry is not None:
+                # Links are relative to the document; graphviz makes them
+                # relative to the image.
+                uri = (app.builder.get_relative_uri(docname, entry.docname) or
+                       app.builder.get_target_uri(docname).rpartition('/')[2])
+                urls[classid] = uri + '#' + classid
+
+        diagram = graphviz()
+        diagram['code'] = dot_code(subgraph, set(classes), urls)
+        # No docname option, so that documents in the same directory showing
+        # the same hierarchy, and so with the same links, share one image.
+        diagram['options'] = {}
+        diagram['alt'] = 'Inheritance diagram of ' + ', '.join(map(class_label, classes))
+        diagram['classes'] = ['dylan-inheritance-diagram']
+        node.replace_self(diagram)
@@ -0,0 +1,114 @@
+# encoding: utf-8
+"""
+inventories.py
+
+Per-library Sphinx inventories of the Dylan domain's objects, enabled by the
+dylan_inventory_shards configurable, so that intersphinx and other consumers
+can fetch only the libraries they need instead of the whole objects.inv.
+
+Copyright (c) 2011-2025 Dylan Hackers. All rights reserved.
+"""
+
+import os
+import re
+import zlib
+
+from sphinx.util import logging
+
+from ..diskcache import write_file
+
+
+logger = logging.getLogger(__name__)
+
+SHARDS_DIRNAME = 'dylan-inventories'
+
+UNSAFE_FILENAME_RE = re.compile(r'[^\w.+-]')
+
+
+def escape (string):
+    return re.sub(r'\s+', ' ', string)
+
+def shard_filename (library):
+    return UNSAFE_FILENAME_RE.sub('_', library) + '.inv'
+
+def entry_library (fullid, entry):
+    """Returns the library fullid of an object, or None if it has none."""
+    if entry.objtype == 'library':
+        return fullid
+    if not entry.prefix:
+        return None
+    return fullid.partition(':')[0]
+
+
+def shard_entries (domain):
+    """
+    Yields (library, [get_objects entry, ...]) for each library, in the order
+    of domain.inventory.
+    """
+    objects = domain.data['objects']
+    libraries = {}
+    for item in domain.inventory:
+        fullid = item[4]
+        library = entry_library(fullid, objects[fullid])
+        if library is not None:
+            libraries.setdefault(library, []).append(item)
+    return sorted(libraries.items())
+
+def write_shard (path, builder, config, domain_name, items):
+    """
+    Writes an objects.inv-format inventory of items to path, compressing each
+    line as it is produced rather than building the whole file in memory.
+    """
+    def write (stream):
+        stream.write(('# Sphinx inventory version 2\n'
+                      '# Project: {0}\n'
+                      '# Version: {1}\n'
+                      '# The remainder of this file is compressed using zlib.\n'
+                      .format(escape(config.project), escape(config.version))).encode())
+        compressor = zlib.compressobj(9)
+        uris = {}
+        for (fullname, dispname, objtype, docname, anchor, prio) in items:
+            if anchor.endswith(fullname):
+                anchor = anchor[:len(anchor) - len(fullname)] + '$'
+            uri = uris.get(docname)
+            if uri is None:
+                uri = uris[docname] = builder.get_target_uri(docname)
+            if anchor:
+                uri += '#' + anchor
+            if dispname == fullname:
+                dispname = '-'
+            line = '{0} {1}:{2} {3} {4} {5}\n'.format(fullname, domain_name, objtype, prio,
+                                                      uri, dispname)
+            stream.write(compressor.compress(line.encode()))
+        stream.write(compressor.flush())
+    write_file(path, write, public=True)
+
+
+#
+# Sphinx event handlers
+#
+
+
+def build_finished (app, exception):
+    if exception is not None or not app.config.dylan_inventory_shards:
+        return
+    if app.builder.format != 'html':
+        return
+    domain = app.env.get_domain('dylan')
+    directory = os.path.join(app.outdir, SHARDS_DIRNAME)
+    os.makedirs(directory, exist_ok=True)
+    written = set()
+    for (library, items) in shard_entries(domain):
+        filename = shard_filename(library)
+        write_shard(os.path.join(directory, filename), app.builder, app.config,
+                    domain.name, items)
+        written.add(filename)
+    # Remove the shards of libraries no longer documented.
+    for filename in os.listdir(directory):
+        if filename.endswith('.inv') and filename not in written:
+            os.remove(os.path.join(directory, filename))
+    logger.info('wrote {0} Dylan library inventories to {1}'.format(len(written), directory))
+
+def setup (app):
+    app.add_config_value('dylan_inventory_shards', False, 'html')
+    app.connect('build-finished', build_finished)
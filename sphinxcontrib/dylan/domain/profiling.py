@@ -0,0 +1,144 @@
+# encoding: utf-8
+"""
+profiling.py
+
+Opt-in timings and counters for the Dylan domain, enabled by the dylan_profile
+configurable and written to dylan-profile.json in the output directory at the
+end of the build.
+
+Copyright (c) 2011-2025 Dylan Hackers. All rights reserved.
+"""
+
+import contextlib
+import json
+import os
+import time
+import weakref
+
+import sphinx
+
+
+REPORT_FILENAME = 'dylan-profile.json'
+
+
+class Profile (object):
+    """
+    Counters and timers for one build. Parallel readers start their own Profile
+    (see get_profile) and the domain merges them back with merge.
+    """
+
+    def __init__ (self):
+        self.pid = os.getpid()
+        self.counters = {}
+        self.timers = {}
+            # name -> [calls, seconds]
+        self.phases = {}
+            # name -> [start, end]
+
+    def count (self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextlib.contextmanager
+    def timer (self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timer = self.timers.setdefault(name, [0, 0.0])
+            timer[0] += 1
+            timer[1] += time.perf_counter() - start
+
+    def start_phase (self, name):
+        self.phases[name] = [time.perf_counter(), None]
+
+    def end_phase (self, name):
+        if name in self.phases:
+            self.phases[name][1] = time.perf_counter()
+
+    def merge (self, other):
+        for (name, n) in other.counters.items():
+            self.count(name, n)
+        for (name, (calls, seconds)) in other.timers.items():
+            timer = self.timers.setdefault(name, [0, 0.0])
+            timer[0] += calls
+            timer[1] += seconds
+
+    def report (self):
+        return {
+            'sphinx': sphinx.__version__,
+            'phases': dict((name, end - start)
+                           for (name, (start, end)) in sorted(self.phases.items())
+                           if end is not None),
+            'counters': dict(sorted(self.counters.items())),
+            'timers': dict((name, {'calls': calls, 'seconds': seconds})
+                           for (name, (calls, seconds)) in sorted(self.timers.items())),
+        }
+
+
+# BuildEnvironment -> Profile of the current build. Kept out of the domain
+# data, which is pickled with the environment.
+_profiles = weakref.WeakKeyDictionary()
+
+def get_profile (env):
+    """
+    Returns the build's Profile, or None if profiling is off. A forked parallel
+    reader gets a fresh Profile, so that only its own work is merged back; it
+    is returned to the main process in the reader's domain data, the only
+    place that is sent back, and merged by merge_domaindata.
+    """
+    profile = _profiles.get(env)
+    if profile is not None and profile.pid != os.getpid():
+        profile = _profiles[env] = Profile()
+        env.domaindata['dylan']['profile'] = profile
+    return profile
+
+def timer (env, name):
+    """Returns a context manager timing name, or doing nothing."""
+    profile = get_profile(env)
+    if profile is None:
+        return contextlib.nullcontext()
+    return profile.timer(name)
+
+
+#
+# Sphinx event handlers
+#
+
+
+def builder_inited (app):
+    if app.config.dylan_profile:
+        profile = _profiles[app.env] = Profile()
+        profile.start_phase('total')
+    else:
+        _profiles.pop(app.env, None)
+
+def env_before_read_docs (app, env, docnames):
+    profile = get_profile(env)
+    if profile is not None:
+        profile.count('documents read', len(docnames))
+        profile.start_phase('read')
+
+def env_updated (app, env):
+    profile = get_profile(env)
+    if profile is not None:
+        profile.end_phase('read')
+        profile.start_phase('write')
+
+def build_finished (app, exception):
+    profile = get_profile(app.env)
+    if profile is None or exception is not None:
+        return
+    profile.end_phase('write')
+    profile.end_phase('total')
+    report = profile.report()
+    report['builder'] = app.builder.name
+    report['parallel'] = app.parallel
+    with open(os.path.join(app.outdir, REPORT_FILENAME), 'w', encoding='utf-8') as stream:
+        json.dump(report, stream, indent=2)
+
+def setup (app):
+    app.add_config_value('dylan_profile', False, '')
+    app.connect('builder-inited', builder_inited)
+    app.connect('env-before-read-docs', env_before_read_docs)
+    app.connect('env-updated', env_updated)
+    app.connect('build-finished', build_finished)
@@ -0,0 +1,128 @@
+# encoding: utf-8
+"""
+search.py
+
+A search index of the Dylan domain's objects for HTML builds, written to
+_static/dylan-search.json and read by dylan-search.js in the opendylan-docs
+theme. Sphinx's own search index splits names like <stretchy-vector>,
+as-uppercase! or floor/ into words; this one keeps them whole, sorted so that
+the browser can find every name with a given prefix by binary search.
+
+The index is a JSON object:
+
+    version     SEARCH_INDEX_VERSION
+    types       object types
+    scopes      object prefixes: "", "library" or "library:module"
+    docs        document URIs, relative to the root of the output directory
+    entries     six values per object, sorted by lowercase short name:
+                the length of the prefix the short name shares with the
+                previous one, the rest of the short name, the rest of the
+                specname (e.g. the specializers of a method), and the indexes
+                of its type, scope and document
+    anchors     entry index -> fullid, for the objects whose fullid is not
+                their lowercased full name with <> as [] and no whitespace
+
+Copyright (c) 2011-2025 Dylan Hackers. All rights reserved.
+"""
+
+import json
+import os
+
+from sphinx.util import logging
+
+from ..diskcache import replace_file
+from .dylandomain import name_to_id
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the format of the index changes, in step with dylan-search.js.
+SEARCH_INDEX_VERSION = 1
+
+SEARCH_INDEX_FILENAME = 'dylan-search.json'
+
+# The theme whose pages load the index.
+THEME_NAME = 'opendylan-docs'
+
+
+def shared_prefix_length (previous, name):
+    limit = min(len(previous), len(name))
+    length = 0
+    while length < limit and previous[length] == name[length]:
+        length += 1
+    return length
+
+def search_index (domain, builder):
+    """Returns the search index of domain's objects as a dict."""
+    objects = domain.data['objects']
+    entries = sorted(((entry.shortname.lower(), entry.fullname.lower(), fullid, entry)
+                      for (fullid, entry) in objects.items()),
+                     key=lambda item: item[:3])
+    types = {}
+        # objtype -> index
+    scopes = {}
+        # prefix -> index
+    docnames = {}
+        # docname -> index
+    docs = []
+    rows = []
+    anchors = {}
+    previous = ''
+    for (index, (_, _, fullid, entry)) in enumerate(entries):
+        if entry.docname not in docnames:
+            docnames[entry.docname] = len(docs)
+            docs.append(builder.get_target_uri(entry.docname))
+        name = entry.shortname
+        shared = shared_prefix_length(previous, name)
+        specializer = entry.specname[len(name):] if entry.specname.startswith(name) else ''
+        rows.extend((shared, name[shared:], specializer,
+                     types.setdefault(entry.objtype, len(types)),
+                     scopes.setdefault(entry.prefix, len(scopes)),
+                     docnames[entry.docname]))
+        if name_to_id(entry.fullname) != fullid:
+            anchors[str(index)] = fullid
+        previous = name
+    return {
+        'version': SEARCH_INDEX_VERSION,
+        'types': list(types),
+        'scopes': list(scopes),
+        'docs': docs,
+        'entries': rows,
+        'anchors': anchors,
+    }
+
+def write_search_index (path, index):
+    """Writes index to path, unless the file already has the same contents."""
+    data = json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return replace_file(path, data)
+
+
+#
+# Sphinx event handlers
+#
+
+
+def wanted (app):
+    """
+    Whether to write the index: per dylan_search_index, or, if that is None,
+    when the opendylan-docs theme, which reads it, is in use.
+    """
+    if app.config.dylan_search_index is None:
+        return app.config.html_theme == THEME_NAME
+    return bool(app.config.dylan_search_index)
+
+def build_finished (app, exception):
+    if exception is not None or not wanted(app):
+        return
+    if app.builder.format != 'html' or getattr(app.builder, 'embedded', False):
+        return
+    domain = app.env.get_domain('dylan')
+    path = os.path.join(app.outdir, '_static', SEARCH_INDEX_FILENAME)
+    if write_search_index(path, search_index(domain, app.builder)):
+        logger.info('wrote Dylan search index of {0} objects to {1}'
+                    .format(len(domain.data['objects']), path))
+
+def setup (app):
+    app.add_config_value('dylan_search_index', None, 'html')
+    app.connect('build-finished', build_finished)
@@ -1,5 +1,7 @@
 import os
 
+from . import assets
+
 def get_html_theme_default():
     return 'opendylan-docs'
 
@@ -10,3 +12,11 @@ def get_html_theme_options_default():
     return {
         'display_version': False
     }
+
+def setup(app):
+    app.add_config_value('dylan_theme_assets', False, 'html')
+    app.connect('build-finished', assets.build_finished)
+    return {
+        'parallel_read_safe': True,
+        'parallel_write_safe': True,
+    }
@@ -0,0 +1,175 @@
+# encoding: utf-8
+"""
+assets.py
+
+An optional post-build step for HTML built with the opendylan-docs theme,
+enabled by the dylan_theme_assets configurable. It minifies the theme's CSS,
+copies each theme asset to a name that includes a hash of its contents, e.g.
+opendylan-docs.0123456789.css, points the HTML pages at those names, and
+writes a gzipped sibling of each HTML, CSS and JavaScript file. A fingerprinted
+URL changes whenever its file does, so it may be cached indefinitely, and a
+server may send the .gz files to clients that accept them.
+
+Only the standard library is used. The original assets are kept, so
+references this step does not rewrite keep working.
+
+Copyright (c) 2011-2025 Dylan Hackers. All rights reserved.
+"""
+
+import gzip
+import hashlib
+import os
+import re
+
+from sphinx.util import logging
+
+from ..diskcache import replace_file
+
+
+logger = logging.getLogger(__name__)
+
+# The theme's own assets, relative to _static.
+ASSETS_DIRNAME = 'opendylan.org'
+
+DIGEST_LENGTH = 10
+
+FINGERPRINTED_RE = re.compile(r'\.[0-9a-f]{%d}(\.[^./]+)$' % DIGEST_LENGTH)
+
+COMPRESSED_SUFFIXES = ('.html', '.css', '.js')
+
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+CSS_SPACE_RE = re.compile(r'\s+')
+CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,>])\s*')
+# Only the space after a colon; before one it may be a descendant combinator,
+# as in "a :hover".
+CSS_COLON_RE = re.compile(r':\s+')
+
+
+def minify_css (text):
+    """
+    Returns text without comments, needless whitespace or final semicolons.
+    Strings and url() arguments with these characters are not supported.
+    """
+    text = CSS_COMMENT_RE.sub('', text)
+    text = CSS_SPACE_RE.sub(' ', text)
+    text = CSS_PUNCTUATION_RE.sub(r'\1', text)
+    text = CSS_COLON_RE.sub(':', text)
+    return text.replace(';}', '}').strip() + '\n'
+
+def fingerprinted_name (relpath, data):
+    """Returns relpath with a hash of data before its extension."""
+    (stem, ext) = os.path.splitext(relpath)
+    return '{0}.{1}{2}'.format(stem, hashlib.sha256(data).hexdigest()[:DIGEST_LENGTH], ext)
+
+def fingerprint_assets (static_dir):
+    """
+    Writes a minified, fingerprinted copy of each theme asset in static_dir,
+    removing older fingerprinted copies. Returns {asset path: fingerprinted
+    path}, both relative to static_dir with / separators.
+    """
+    mapping = {}
+    root = os.path.join(static_dir, ASSETS_DIRNAME)
+    for (dirpath, _, filenames) in os.walk(root):
+        for filename in filenames:
+            if FINGERPRINTED_RE.search(filename) or filename.endswith(('.gz', '.tmp')):
+                continue
+            path = os.path.join(dirpath, filename)
+            with open(path, 'rb') as stream:
+                data = stream.read()
+            if filename.endswith('.css'):
+                data = minify_css(data.decode('utf-8')).encode('utf-8')
+            relpath = os.path.relpath(path, static_dir).replace(os.sep, '/')
+            mapping[relpath] = fingerprinted_name(relpath, data)
+            replace_file(os.path.join(static_dir, mapping[relpath]), data)
+            current = os.path.basename(mapping[relpath])
+            for other in filenames:
+                unzipped = other[:-len('.gz')] if other.endswith('.gz') else other
+                if (unzipped != current and FINGERPRINTED_RE.search(unzipped) and
+                        FINGERPRINTED_RE.sub(r'\1', unzipped) == filename):
+                    os.remove(os.path.join(dirpath, other))
+    return mapping
+
+def reference_pattern (mapping):
+    """
+    Returns a regular expression matching references to the assets of
+    mapping, fingerprinted or not and with or without Sphinx's ?v= query.
+    Group 1 is the asset path without its extension and group 2 the extension.
+    """
+    alternatives = []
+    for relpath in sorted(mapping, key=len, reverse=True):
+        (stem, ext) = os.path.splitext(relpath)
+        alternatives.append('({0})(?:\\.[0-9a-f]{{{1}}})?({2})'.format(
+            re.escape(stem), DIGEST_LENGTH, re.escape(ext)))
+    return re.compile(r'_static/(?:{0})(?:\?v=[0-9a-f]+)?'.format('|'.join(alternatives)))
+
+def rewrite_references (outdir, mapping):
+    """
+    Points the HTML pages in outdir at the fingerprinted assets of mapping.
+    Returns the number of pages changed.
+    """
+    if not mapping:
+        return 0
+    pattern = reference_pattern(mapping)
+    marker = ('_static/' + ASSETS_DIRNAME + '/').encode('utf-8')
+
+    def replace (match):
+        groups = [group for group in match.groups() if group is not None]
+        return '_static/' + mapping[groups[0] + groups[1]]
+
+    changed = 0
+    for (dirpath, _, filenames) in os.walk(outdir):
+        for filename in filenames:
+            if not filename.endswith('.html'):
+                continue
+            path = os.path.join(dirpath, filename)
+            with open(path, 'rb') as stream:
+                data = stream.read()
+            if marker not in data:
+                continue
+            text = pattern.sub(replace, data.decode('utf-8'))
+            if replace_file(path, text.encode('utf-8')):
+                changed += 1
+    return changed
+
+def precompress (outdir):
+    """
+    Writes a .gz sibling of each HTML, CSS and JavaScript file in outdir that
+    lacks an up-to-date one. Returns the number written.
+    """
+    written = 0
+    for (dirpath, _, filenames) in os.walk(outdir):
+        for filename in filenames:
+            if not filename.endswith(COMPRESSED_SUFFIXES):
+                continue
+            path = os.path.join(dirpath, filename)
+            try:
+                if os.stat(path + '.gz').st_mtime_ns >= os.stat(path).st_mtime_ns:
+                    continue
+            except OSError:
+                pass
+            with open(path, 'rb') as stream:
+                data = stream.read()
+            # mtime=0 so that the same file always compresses the same.
+            replace_file(path + '.gz', gzip.compress(data, 9, mtime=0))
+            written += 1
+    return written
+
+
+#
+# Sphinx event handlers
+#
+
+
+def build_finished (app, exception):
+    if exception is not None or not app.config.dylan_theme_assets:
+        return
+    if app.builder.format != 'html':
+        return
+    static_dir = os.path.join(app.outdir, '_static')
+    if not os.path.isdir(os.path.join(static_dir, ASSETS_DIRNAME)):
+        return
+    mapping = fingerprint_assets(static_dir)
+    pages = rewrite_references(app.outdir, mapping)
+    compressed = precompress(app.outdir)
+    logger.info('fingerprinted {0} theme assets, updated {1} pages, compressed {2} files'
+                .format(len(mapping), pages, compressed))
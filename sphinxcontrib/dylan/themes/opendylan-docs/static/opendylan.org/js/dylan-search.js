@@ -0,0 +1,196 @@
+/*
+ * dylan-search.js
+ *
+ * Loads _static/dylan-search.json, the index of Dylan API objects written by
+ * the Dylan domain (see sphinxcontrib/dylan/domain/search.py), and looks up
+ * names in it by prefix. On the search page, the Dylan objects matching the
+ * query are listed above Sphinx's own results.
+ *
+ * :copyright: Copyright 2011-2025 by the Dylan Hackers.
+ * :license: MIT.
+ */
+
+var DylanSearch = (function () {
+  "use strict";
+
+  var INDEX_VERSION = 1;
+  var STRIDE = 6;
+  var loading = null;
+
+  function contentRoot() {
+    var root = document.documentElement.dataset.content_root;
+    if (root === undefined && typeof DOCUMENTATION_OPTIONS !== "undefined") {
+      root = DOCUMENTATION_OPTIONS.URL_ROOT;
+    }
+    return root || "";
+  }
+
+  function nameToId(name) {
+    return name.replace(/</g, "[").replace(/>/g, "]").replace(/\s+/g, "").toLowerCase();
+  }
+
+  // Expands the front-coded entries into parallel arrays, sorted by key.
+  function decode(data) {
+    if (data.version !== INDEX_VERSION) {
+      throw new Error("unsupported Dylan search index version " + data.version);
+    }
+    var rows = data.entries;
+    var count = rows.length / STRIDE;
+    var index = {
+      names: new Array(count), keys: new Array(count), specializers: new Array(count),
+      types: new Array(count), scopes: new Array(count), docs: new Array(count),
+      typeNames: data.types, scopeNames: data.scopes, uris: data.docs,
+      anchors: data.anchors
+    };
+    var previous = "";
+    for (var i = 0, j = 0; i < count; i++, j += STRIDE) {
+      var name = previous.slice(0, rows[j]) + rows[j + 1];
+      index.names[i] = name;
+      index.keys[i] = name.toLowerCase();
+      index.specializers[i] = rows[j + 2];
+      index.types[i] = rows[j + 3];
+      index.scopes[i] = rows[j + 4];
+      index.docs[i] = rows[j + 5];
+      previous = name;
+    }
+    return index;
+  }
+
+  // Returns the first position whose key is not less than prefix.
+  function lowerBound(keys, prefix) {
+    var low = 0, high = keys.length;
+    while (low < high) {
+      var middle = (low + high) >>> 1;
+      if (keys[middle] < prefix) {
+        low = middle + 1;
+      } else {
+        high = middle;
+      }
+    }
+    return low;
+  }
+
+  function makeResult(index, i) {
+    var scope = index.scopeNames[index.scopes[i]];
+    var parts = scope ? scope.split(":") : [];
+    var specname = index.names[i] + index.specializers[i];
+    var anchor = index.anchors[i] || nameToId(scope ? scope + ":" + specname : specname);
+    return {
+      name: index.names[i],
+      specname: specname,
+      type: index.typeNames[index.types[i]],
+      library: parts[0] || null,
+      module: parts[1] || null,
+      uri: contentRoot() + index.uris[index.docs[i]] + "#" + anchor
+    };
+  }
+
+  // Returns which scopes, by index, are in the library and module of facets.
+  function allowedScopes(index, facets) {
+    return index.scopeNames.map(function (scope) {
+      var parts = scope.toLowerCase().split(":");
+      return (!facets.library || parts[0] === facets.library) &&
+             (!facets.module || parts[1] === facets.module);
+    });
+  }
+
+  /*
+   * Returns up to facets.limit (default 50) results for the objects whose
+   * short names start with query, ignoring case, or with "<" + query. The
+   * query may be qualified as "module:name" or "library:module:name";
+   * facets.library, facets.module and facets.type narrow the results further.
+   */
+  function lookup(index, query, facets) {
+    facets = Object.assign({}, facets || {});
+    var limit = facets.limit || 50;
+    var parts = query.trim().toLowerCase().split(":");
+    var prefix = parts.pop();
+    if (parts.length === 2) {
+      facets.library = facets.library || parts[0];
+    }
+    if (parts.length) {
+      facets.module = facets.module || parts[parts.length - 1];
+    }
+    facets.library = facets.library && facets.library.toLowerCase();
+    facets.module = facets.module && facets.module.toLowerCase();
+    var results = [];
+    if (!prefix) {
+      return results;
+    }
+    var scopes = allowedScopes(index, facets);
+    var type = facets.type ? index.typeNames.indexOf(facets.type) : -1;
+    var prefixes = prefix.charAt(0) === "<" ? [prefix] : [prefix, "<" + prefix];
+    for (var p = 0; p < prefixes.length && results.length < limit; p++) {
+      var keys = index.keys;
+      for (var i = lowerBound(keys, prefixes[p]);
+           i < keys.length && results.length < limit && keys[i].startsWith(prefixes[p]);
+           i++) {
+        if (scopes[index.scopes[i]] && (!facets.type || index.types[i] === type)) {
+          results.push(makeResult(index, i));
+        }
+      }
+    }
+    return results;
+  }
+
+  // Returns a promise of the decoded index, fetching it on first use.
+  function load() {
+    if (loading === null) {
+      loading = fetch(contentRoot() + "_static/dylan-search.json")
+        .then(function (response) {
+          if (!response.ok) {
+            throw new Error("cannot load the Dylan search index: " + response.status);
+          }
+          return response.json();
+        })
+        .then(decode);
+    }
+    return loading;
+  }
+
+  function showResults(container, results) {
+    var section = document.createElement("div");
+    section.className = "dylan-search-results";
+    var heading = document.createElement("h2");
+    heading.textContent = "Dylan API";
+    section.appendChild(heading);
+    var list = document.createElement("ul");
+    results.forEach(function (result) {
+      var item = document.createElement("li");
+      var link = document.createElement("a");
+      link.href = result.uri;
+      link.textContent = result.specname;
+      item.appendChild(link);
+      var context = [result.type, result.library, result.module].filter(Boolean);
+      item.appendChild(document.createTextNode(" (" + context.join(", ") + ")"));
+      list.appendChild(item);
+    });
+    section.appendChild(list);
+    container.parentNode.insertBefore(section, container);
+  }
+
+  document.addEventListener("DOMContentLoaded", function () {
+    var container = document.getElementById("search-results");
+    var query = new URLSearchParams(window.location.search).get("q");
+    if (!container || !query) {
+      return;
+    }
+    load().then(function (index) {
+      var results = lookup(index, query);
+      if (results.length) {
+        showResults(container, results);
+      }
+    }).catch(function (error) {
+      console.warn(error);
+    });
+  });
+
+  return {
+    load: load,
+    lookup: function (query, facets) {
+      return load().then(function (index) {
+        return lookup(index, query, facets);
+      });
+    }
+  };
+})();